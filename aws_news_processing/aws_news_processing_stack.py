@@ -11,6 +11,8 @@ from aws_cdk import (
     aws_stepfunctions_tasks as sfn_tasks,
     aws_events as events,
     aws_events_targets as targets,
+    aws_lambda_event_sources as event_sources,
+    aws_sqs as sqs,
     Duration,
     CfnOutput,
 )
@@ -31,6 +33,44 @@ class AwsNewsProcessingStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
         )
 
+        # DynamoDB table for storing feed fetch state (ETag/Last-Modified)
+        feed_state_table = dynamodb.Table(
+            self, "FeedStateTable",
+            table_name="AwsNewsProcessingStack-FeedStateTable",
+            partition_key=dynamodb.Attribute(name="state_key", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+        )
+
+        # DynamoDB table for caching translations and summaries by content hash
+        content_cache_table = dynamodb.Table(
+            self, "ContentCacheTable",
+            table_name="AwsNewsProcessingStack-ContentCacheTable",
+            partition_key=dynamodb.Attribute(name="cache_key", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+        )
+
+        # DynamoDB table for coordinating the Notion API rate limit across concurrent Lambdas
+        notion_rate_limit_table = dynamodb.Table(
+            self, "NotionRateLimitTable",
+            table_name="AwsNewsProcessingStack-NotionRateLimitTable",
+            partition_key=dynamodb.Attribute(name="limiter_key", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+        )
+
+        # SQS queue for handing processed articles to the Notion publisher
+        notion_publish_dlq = sqs.Queue(
+            self, "NotionPublishDeadLetterQueue",
+            retention_period=Duration.days(14),
+        )
+        notion_publish_queue = sqs.Queue(
+            self, "NotionPublishQueue",
+            visibility_timeout=Duration.minutes(30),
+            retention_period=Duration.days(4),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=5, queue=notion_publish_dlq),
+        )
+
         # IAM role for Lambda functions
         lambda_role = iam.Role(
             self, "LambdaRole",
@@ -42,13 +82,29 @@ class AwsNewsProcessingStack(Stack):
 
         # Add permissions to the Lambda role
         lambda_role.add_to_policy(iam.PolicyStatement(
-            actions=["ssm:GetParameter"],
+            actions=["ssm:GetParameter", "ssm:GetParameters"],
             resources=["*"]
         ))
         lambda_role.add_to_policy(iam.PolicyStatement(
-            actions=["dynamodb:Scan", "dynamodb:PutItem"],
+            actions=["dynamodb:Scan", "dynamodb:GetItem", "dynamodb:PutItem"],
             resources=[services_table.table_arn]
         ))
+        lambda_role.add_to_policy(iam.PolicyStatement(
+            actions=["dynamodb:GetItem", "dynamodb:PutItem"],
+            resources=[feed_state_table.table_arn]
+        ))
+        lambda_role.add_to_policy(iam.PolicyStatement(
+            actions=["dynamodb:GetItem", "dynamodb:PutItem"],
+            resources=[content_cache_table.table_arn]
+        ))
+        lambda_role.add_to_policy(iam.PolicyStatement(
+            actions=["dynamodb:UpdateItem"],
+            resources=[notion_rate_limit_table.table_arn]
+        ))
+        lambda_role.add_to_policy(iam.PolicyStatement(
+            actions=["sqs:SendMessage"],
+            resources=[notion_publish_queue.queue_arn]
+        ))
         lambda_role.add_to_policy(iam.PolicyStatement(
             actions=[
                 "iam:GenerateServiceLastAccessedDetails",
@@ -70,36 +126,90 @@ class AwsNewsProcessingStack(Stack):
             role=lambda_role,
         )
 
+        # fetch_news と処理結果の記録は同じコードを別のハンドラで使う
+        fetch_news_code = _lambda.Code.from_asset(self.bundle_lambda_asset("lambda/fetch_news"))
+
         # Lambda function to fetch news
         fetch_news_lambda = _lambda.Function(
             self, "FetchNewsLambdaFunction",
             runtime=_lambda.Runtime.PYTHON_3_9,
             handler="index.handler",
-            code=_lambda.Code.from_asset(self.bundle_lambda_asset("lambda/fetch_news")),
+            code=fetch_news_code,
             timeout=Duration.minutes(5),
             environment={
                 "SERVICES_TABLE_NAME": services_table.table_name,
+                "FEED_STATE_TABLE_NAME": feed_state_table.table_name,
+                "ARTICLE_BATCH_SIZE": "8",
             },
             role=lambda_role,
         )
 
-        # Lambda function for tagging and adding to Notion
+        # Lambda function for marking articles as seen once process_article has published or queued them
+        record_processed_lambda = _lambda.Function(
+            self, "RecordProcessedLambdaFunction",
+            runtime=_lambda.Runtime.PYTHON_3_9,
+            handler="record_processed.handler",
+            code=fetch_news_code,
+            timeout=Duration.minutes(1),
+            environment={
+                "FEED_STATE_TABLE_NAME": feed_state_table.table_name,
+            },
+            role=lambda_role,
+        )
+
+        # process_article と Notion publisher は同じコードを別のハンドラで使う
+        process_article_code = _lambda.Code.from_asset(self.bundle_lambda_asset("lambda/process_article"))
+
+        # Lambda function for tagging and handing articles to the Notion publisher
         process_article_lambda = _lambda.Function(
             self, "ProcessArticleLambdaFunction",
             runtime=_lambda.Runtime.PYTHON_3_9,
             handler="index.handler",
-            code=_lambda.Code.from_asset(self.bundle_lambda_asset("lambda/process_article")),
-            timeout=Duration.minutes(5),
+            code=process_article_code,
+            timeout=Duration.minutes(15),
             environment={
                 "SERVICES_TABLE_NAME": services_table.table_name,
                 "NOTION_API_KEY_PARAM": "/update2notion/notion-api-key",
                 "NOTION_DB_ID_PARAM": "/update2notion/notion-db-id",
                 "OPENAI_API_KEY_PARAM": "/update2notion/openai-api-key",
+                "BATCH_MAX_WORKERS": "4",
+                "OPENAI_MAX_CONCURRENCY": "4",
+                "NOTION_INDEX_LOOKBACK_DAYS": "5",
+                "CONTENT_CACHE_TABLE_NAME": content_cache_table.table_name,
+                "COMBINED_LLM_CALL": "false",
+                "NOTION_REQUESTS_PER_SECOND": "3",
+                "NOTION_RATE_LIMIT_TABLE_NAME": notion_rate_limit_table.table_name,
+                "NOTION_PUBLISH_QUEUE_URL": notion_publish_queue.queue_url,
             },
             role=lambda_role,
             memory_size=512,
         )
 
+        # Lambda function for publishing queued articles to Notion at the API rate limit
+        notion_publisher_lambda = _lambda.Function(
+            self, "NotionPublisherLambdaFunction",
+            runtime=_lambda.Runtime.PYTHON_3_9,
+            handler="notion_publisher.handler",
+            code=process_article_code,
+            timeout=Duration.minutes(5),
+            environment={
+                "NOTION_API_KEY_PARAM": "/update2notion/notion-api-key",
+                "NOTION_DB_ID_PARAM": "/update2notion/notion-db-id",
+                "NOTION_INDEX_LOOKBACK_DAYS": "5",
+                "NOTION_REQUESTS_PER_SECOND": "3",
+                "NOTION_RATE_LIMIT_TABLE_NAME": notion_rate_limit_table.table_name,
+                "PUBLISH_MAX_WORKERS": "3",
+            },
+            role=lambda_role,
+        )
+        notion_publisher_lambda.add_event_source(event_sources.SqsEventSource(
+            notion_publish_queue,
+            batch_size=10,
+            max_batching_window=Duration.seconds(30),
+            max_concurrency=2,
+            report_batch_item_failures=True,
+        ))
+
         # Step Functions IAM role
         step_functions_role = iam.Role(
             self, "StepFunctionsRole",
@@ -110,6 +220,7 @@ class AwsNewsProcessingStack(Stack):
         update_services_lambda.grant_invoke(step_functions_role)
         fetch_news_lambda.grant_invoke(step_functions_role)
         process_article_lambda.grant_invoke(step_functions_role)
+        record_processed_lambda.grant_invoke(step_functions_role)
 
         # Step Functions definition
         update_services_task = sfn_tasks.LambdaInvoke(
@@ -128,17 +239,29 @@ class AwsNewsProcessingStack(Stack):
             self, "ProcessArticleTask",
             lambda_function=process_article_lambda,
             payload=sfn.TaskInput.from_json_path_at("$"),
+            result_selector={"results.$": "$.Payload.results"},
             result_path="$.result",
         )
 
+        # 記事は fetch_news がまとめたバッチ単位で process_article に渡す
         map_state = sfn.Map(
             self, "ProcessArticlesMap",
             max_concurrency=5,
-            items_path="$.articles",
+            items_path="$.batches",
             result_path="$.processedArticles",
         ).iterator(process_article_task)
 
-        definition = update_services_task.next(fetch_news_task.next(map_state))
+        # 処理に成功した記事だけを既出として記録する（失敗した記事は次回の fetch_news で渡し直す）
+        record_processed_task = sfn_tasks.LambdaInvoke(
+            self, "RecordProcessedTask",
+            lambda_function=record_processed_lambda,
+            payload=sfn.TaskInput.from_object({
+                "processedArticles": sfn.JsonPath.list_at("$.processedArticles"),
+            }),
+            result_path=sfn.JsonPath.DISCARD,
+        )
+
+        definition = update_services_task.next(fetch_news_task.next(map_state.next(record_processed_task)))
 
         state_machine = sfn.StateMachine(
             self, "AwsNewsProcessingStateMachine",
@@ -167,6 +290,8 @@ class AwsNewsProcessingStack(Stack):
 
     def bundle_lambda_asset(self, asset_path):
         temp_dir = os.path.join(os.getcwd(), f'temp_lambda_build_{os.path.basename(asset_path)}')
+        # 前回のビルドで残ったファイル（削除済みの requirements.txt など）を持ち込まないよう作り直す
+        shutil.rmtree(temp_dir, ignore_errors=True)
         os.makedirs(temp_dir, exist_ok=True)
     
         try:
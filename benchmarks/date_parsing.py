@@ -0,0 +1,71 @@
+"""
+feedparser の日付解析のベンチマーク
+
+上流の実装と同じ、登録順にすべてのハンドラを試す解析と、形ごとに覚えたハンドラを先に試す解析
+（LRU キャッシュなし・あり）を比較する。
+
+    python benchmarks/date_parsing.py
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'fetch_news'))
+
+from feedparser import datetimes
+
+ROUNDS = 50
+
+
+def ordered_scan(date_string):
+    # 上流の _parse_date と同じ、登録順にすべてのハンドラを試す解析
+    if not date_string:
+        return None
+    for handler in datetimes._date_handlers:
+        date9tuple = datetimes._try_handler(handler, date_string)
+        if date9tuple:
+            return date9tuple
+    return None
+
+
+def shape_only(date_string):
+    # LRU キャッシュを通さず、形ごとのハンドラの記憶だけを使う解析
+    return datetimes._parse_date_cached.__wrapped__(date_string)
+
+
+def cached(date_string):
+    return datetimes._parse_date(date_string)
+
+
+def measure(parse, date_strings, rounds):
+    datetimes._parse_date_cached.cache_clear()
+    datetimes._handlers_by_shape.clear()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for date_string in date_strings:
+            parse(date_string)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    # 同じフィードを2回読んだ場合のように、100件の RFC 822 の日付がそれぞれ2回現れる
+    repeated = [format_datetime(now - timedelta(hours=7 * i)) for i in range(100)] * 2
+    # キャッシュが効かない、すべて異なる日付
+    distinct = [format_datetime(now - timedelta(minutes=13 * i)) for i in range(5000)]
+
+    assert all(ordered_scan(s) == cached(s) for s in repeated + distinct)
+
+    print('100 RFC 822 dates x2, %d rounds:' % ROUNDS)
+    print('  ordered scan: %.1f ms' % measure(ordered_scan, repeated, ROUNDS))
+    print('  shape only:   %.1f ms' % measure(shape_only, repeated, ROUNDS))
+    print('  cached:       %.1f ms' % measure(cached, repeated, ROUNDS))
+    print('5000 distinct RFC 822 dates:')
+    print('  ordered scan: %.1f ms' % measure(ordered_scan, distinct, 1))
+    print('  shape only:   %.1f ms' % measure(shape_only, distinct, 1))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+feedparser の 'default' プロファイルと 'trusted' プロファイルの解析時間を比較するベンチマーク
+
+引数にフィードのファイルを渡すとそのフィードを、渡さなければ HTML の content:encoded を持つ
+200件の What's New 形式の合成フィードを解析する。両方のプロファイルでタイトル、リンク、
+公開日時が一致することも確認する。
+
+    python benchmarks/feed_parse_profiles.py [feed.xml]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'fetch_news'))
+
+import feedparser
+
+ROUNDS = 5
+ITEM_COUNT = 200
+
+BODY = (
+    '<p>Amazon S3 now supports <a href="/s3/features/">a new feature</a> in all commercial regions. '
+    'You can use it with <code>aws s3api</code> &amp; the console.</p>'
+    '<ul><li><b>Faster</b> uploads</li><li><i>Lower</i> cost</li></ul>'
+    '<img src="/images/s3.png" alt="S3"/><p>To learn more, see the <a href="https://docs.aws.amazon.com/s3/">documentation</a>.</p>'
+) * 4
+
+
+def synthetic_feed(item_count=ITEM_COUNT):
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    items = ''.join(
+        '<item><guid isPermaLink="false">guid-%d</guid><title>Amazon S3 now supports feature %d</title>'
+        '<link>https://aws.amazon.com/about-aws/whats-new/2026/10/feature-%d/</link>'
+        '<description>&lt;p&gt;Amazon S3 feature %d&lt;/p&gt;</description>'
+        '<content:encoded><![CDATA[%s]]></content:encoded>'
+        '<pubDate>%s</pubDate><category>general:products/amazon-s3</category><author>aws@amazon.com</author></item>'
+        % (i, i, i, i, BODY, format_datetime(now - timedelta(hours=i)))
+        for i in range(item_count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+        '<title>Recent Announcements</title><link>https://aws.amazon.com/about-aws/whats-new/recent/</link>'
+        + items + '</channel></rss>'
+    ).encode('utf-8')
+
+
+def measure(document, profile):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = feedparser.parse(document, profile=profile)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, [(e.get('title'), e.get('link'), e.get('published_parsed')) for e in result.entries]
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            document = f.read()
+    else:
+        document = synthetic_feed()
+
+    default_time, default_entries = measure(document, 'default')
+    trusted_time, trusted_entries = measure(document, 'trusted')
+    print('entries: %d, size: %.0f KB' % (len(default_entries), len(document) / 1024))
+    print('default: %.1f ms' % (default_time * 1000))
+    print('trusted: %.1f ms' % (trusted_time * 1000))
+    print('title/link/published identical: %s' % (default_entries == trusted_entries))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Notion のブロックに入れる本文の分割のベンチマーク
+
+以前の、単語を1つ足すたびにチャンク全体を連結し直す分割と、iter_content_chunks を
+100 KB の英語の本文、句点のある日本語の本文、区切りのない日本語の本文で比較する。
+すべてのチャンクが NOTION_TEXT_LIMIT 文字以下で、連結すると空白を除いて元の本文に戻ることも確認する。
+
+    python benchmarks/notion_split.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'process_article'))
+# notion_client が読み込み時に boto3 のクライアントを作るため、リージョンを設定しておく
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from notion_integration import NOTION_TEXT_LIMIT, iter_content_chunks
+
+ROUNDS = 5
+CONTENT_LENGTH = 100_000
+
+EN_WORDS = ['Amazon', 'S3', 'now', 'supports', 'the', 'feature', 'version', '3.5', 'e.g.', 'in', 'all', 'regions']
+JA_SENTENCE = 'Amazon S3 で新しい機能が利用可能になりました'
+
+
+def old_split(content, max_length=NOTION_TEXT_LIMIT):
+    # 以前の add_to_notion の中にあった、空白だけで区切る分割
+    words = content.split()
+    chunks = []
+    current_chunk = []
+    for word in words:
+        if len(' '.join(current_chunk + [word])) <= max_length:
+            current_chunk.append(word)
+        else:
+            chunks.append(' '.join(current_chunk))
+            current_chunk = [word]
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+    return chunks
+
+
+def new_split(content):
+    return list(iter_content_chunks(content))
+
+
+def english_paragraph(rng):
+    sentences = (
+        ' '.join(rng.choice(EN_WORDS) for _ in range(rng.randint(8, 25))) + '.'
+        for _ in range(rng.randint(2, 12))
+    )
+    return ' '.join(sentences)
+
+
+def japanese_paragraph(rng):
+    return ''.join(JA_SENTENCE * rng.randint(1, 4) + '。' for _ in range(rng.randint(2, 30)))
+
+
+def build(make_paragraph, rng):
+    paragraphs = []
+    length = 0
+    while length < CONTENT_LENGTH:
+        paragraph = make_paragraph(rng)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def measure(split, content):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        chunks = split(content)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, chunks
+
+
+def without_whitespace(text):
+    return ''.join(text.split())
+
+
+def main():
+    rng = random.Random(1)
+    contents = [
+        ('English', build(english_paragraph, rng)),
+        ('Japanese', build(japanese_paragraph, rng)),
+        ('Japanese, no breaks', 'あ' * CONTENT_LENGTH),
+    ]
+
+    print('best of %d rounds:' % ROUNDS)
+    for name, content in contents:
+        new_ms, new_chunks = measure(new_split, content)
+        assert all(0 < len(chunk) <= NOTION_TEXT_LIMIT for chunk in new_chunks), name
+        assert without_whitespace(''.join(new_chunks)) == without_whitespace(content), name
+        old_ms, old_chunks = measure(old_split, content)
+        print('  %s (%d chars):' % (name, len(content)))
+        print('    old: %8.1f ms, %3d chunks, longest %d chars'
+              % (old_ms, len(old_chunks), max(map(len, old_chunks))))
+        print('    new: %8.1f ms, %3d chunks, longest %d chars'
+              % (new_ms, len(new_chunks), max(map(len, new_chunks))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+相対 URI の解決と HTML のサニタイズを1回の解析で行う経路と、2回に分けて行う経路の比較
+
+RelativeURIResolver の出力を _HTMLSanitizer に通す経路（2パス）と
+_resolve_and_sanitize_html（1パス）の出力を比べ、200件の What's New 形式の本文での時間を測る。
+
+通常の本文では出力が一致することを確認する。`-->` で閉じていないコメント（`--!>` や `-- >` で
+終わるもの）の後ろでは出力が異なる: RelativeURIResolver はそこから先を解析せずにそのまま出力し、
+_HTMLSanitizer はコメントの終わりを探して解析を続けるため、2パスでは相対 URI が残り、
+1パスでは解決される。この違いも期待どおりの出力として確認する。
+
+    python benchmarks/sanitize_one_pass.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'fetch_news'))
+
+from feedparser.sanitizer import _resolve_and_sanitize_html, _sanitize_html
+from feedparser.urls import resolve_relative_uris
+
+ROUNDS = 5
+ITEM_COUNT = 200
+
+BASE_URI = 'https://aws.amazon.com/about-aws/whats-new/'
+CONTENT_TYPE = 'text/html'
+
+BODY = (
+    '<p>Amazon S3 now supports <a href="/s3/features/">a new feature</a> in all commercial regions. '
+    'You can use it with <code>aws s3api</code> &amp; the console.</p>'
+    '<ul><li><b>Faster</b> uploads</li><li><i>Lower</i> cost</li></ul>'
+    '<!-- tracking --><script>alert(1)</script>'
+    '<img src="images/s3.png" alt="S3" onerror="x()"/><p>To learn more, see the '
+    '<a href="https://docs.aws.amazon.com/s3/">documentation</a>.</p>'
+) * 4
+
+# 2パスと1パスで出力が一致する断片
+MATCHING_CASES = [
+    '<p>a <a href="/x">x</a> <!-- c --> <img src="i.png"></p>',
+    '<p>before <a href="/x">x</a></p><!-- unclosed <a href="/y">y</a> <img src="z.png">',
+    '<!-- unclosed <a href="/y">y</a>',
+    '<p>x</p><![CDATA[ <a href="/c">c</a> ]]>',
+    '<svg><image xlink:href="/i.svg"/></svg><blockquote cite="q.html">q</blockquote>',
+]
+
+# `-->` で閉じていないコメントの後ろで出力が異なる断片と、それぞれの (2パス, 1パス) の出力
+DIVERGING_CASES = [
+    (
+        '<p>p</p><!-- x --!> <a href="/y">y</a>',
+        '<p>p</p> <a href="/y">y</a>',
+        '<p>p</p> <a href="https://aws.amazon.com/y">y</a>',
+    ),
+    (
+        '<!-- a -- b<img src="z.png"><p><img src="z.png"></p>',
+        '<p><img src="z.png" /></p>',
+        '<p><img src="https://aws.amazon.com/about-aws/whats-new/z.png" /></p>',
+    ),
+]
+
+
+def two_pass(html_source):
+    resolved = resolve_relative_uris(html_source, BASE_URI, 'utf-8', CONTENT_TYPE)
+    return _sanitize_html(resolved, 'utf-8', CONTENT_TYPE)
+
+
+def one_pass(html_source):
+    return _resolve_and_sanitize_html(html_source, BASE_URI, 'utf-8', CONTENT_TYPE)
+
+
+def check():
+    for html_source in MATCHING_CASES + [BODY]:
+        assert one_pass(html_source) == two_pass(html_source), html_source
+    for html_source, expected_two_pass, expected_one_pass in DIVERGING_CASES:
+        assert two_pass(html_source) == expected_two_pass, html_source
+        assert one_pass(html_source) == expected_one_pass, html_source
+
+
+def measure(convert, bodies):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for body in bodies:
+            convert(body)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    check()
+    print('output check: %d matching, %d known differences after unclosed comments'
+          % (len(MATCHING_CASES) + 1, len(DIVERGING_CASES)))
+
+    bodies = [BODY.replace('new feature', 'new feature %d' % i) for i in range(ITEM_COUNT)]
+    print('%d bodies, best of %d rounds:' % (ITEM_COUNT, ROUNDS))
+    print('  two pass: %.1f ms' % measure(two_pass, bodies))
+    print('  one pass: %.1f ms' % measure(one_pass, bodies))
+
+
+if __name__ == '__main__':
+    main()
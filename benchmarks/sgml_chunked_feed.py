@@ -0,0 +1,73 @@
+"""
+sgmllib.SGMLParser に入力を分割して渡した場合の処理時間が入力の大きさに比例することを確かめるベンチマーク
+
+0.25〜2 MB の合成フィードを 4 KB ごとに feed() する場合と、先頭に閉じていないコメントがあり
+16 KB ごとに feed() する場合（処理待ちのマークアップが残り続ける最悪のケース）を測り、
+1 MB あたりの時間を表示する。時間が線形に増えていれば 1 MB あたりの時間はほぼ一定になる。
+
+feedparser の緩いパーサー（_BaseHTMLProcessor.feed）は入力全体を1回の feed() と close() で
+渡すため、この分割入力の経路は通らない。
+
+引数に別の sgmllib.py（変更前の版など）を渡すと、そのパーサーでも同じ入力を測る。
+
+    python benchmarks/sgml_chunked_feed.py [baseline_sgmllib.py]
+"""
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'fetch_news'))
+
+import sgmllib
+
+SIZES_MB = (0.25, 0.5, 1, 2)
+
+BODY = '<p>Some text with <a href="/x">a link</a> &amp; entity &#169; and <b>bold</b>.</p>' * 20
+
+
+def synthetic_feed(size_mb):
+    item = (
+        '<item><title>t</title><link>https://aws.amazon.com/x/</link>'
+        '<description><![CDATA[%s]]></description><pubDate>Sat, 17 Oct 2026 00:00:00 GMT</pubDate></item>' % BODY
+    )
+    items = item * max(int(size_mb * 1024 * 1024 / len(item)), 1)
+    return '<rss version="2.0"><channel><title>x</title>' + items + '</channel></rss>'
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location('baseline_sgmllib', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def feed_in_chunks(module, document, chunk_size):
+    parser = module.SGMLParser()
+    start = time.perf_counter()
+    for offset in range(0, len(document), chunk_size):
+        parser.feed(document[offset:offset + chunk_size])
+    parser.close()
+    return time.perf_counter() - start
+
+
+def run(name, module):
+    print(name)
+    print('%8s %22s %22s' % ('size', '4 KB chunks', 'pending comment'))
+    for size_mb in SIZES_MB:
+        document = synthetic_feed(size_mb)
+        size = len(document) / (1024 * 1024)
+        chunked = feed_in_chunks(module, document, 4096)
+        pending = feed_in_chunks(module, '<!-- ' + document, 16384)
+        print('%6.2f MB %8.1f ms (%5.1f/MB) %8.1f ms (%5.1f/MB)' % (
+            size, chunked * 1000, chunked * 1000 / size, pending * 1000, pending * 1000 / size))
+
+
+def main():
+    run('sgmllib (lambda/fetch_news)', sgmllib)
+    if len(sys.argv) > 1:
+        run('baseline (%s)' % sys.argv[1], load_module(sys.argv[1]))
+
+
+if __name__ == '__main__':
+    main()
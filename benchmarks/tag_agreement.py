@@ -0,0 +1,52 @@
+"""
+ローカルのタガー（service_tagger.ServiceTagger）の精度を確認するスクリプト
+
+fixtures/tagging_samples.json の手作業でラベル付けした What's New の記事を、
+fixtures/aws_services.json のサービス一覧（update_services の略称の規則で作成した 36 件）で
+タグ付けし、ローカルで決まった割合（LLM の呼び出しを省けた割合）と、ラベルとの一致率を表示する。
+expected が null の記事は、この一覧では決められない（LLM に任せるべき）ことを表す。
+
+    python benchmarks/tag_agreement.py
+"""
+import json
+import os
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'lambda', 'process_article'))
+
+from service_tagger import ServiceTagger
+
+
+def load_fixture(name):
+    with open(os.path.join(BENCHMARK_DIR, 'fixtures', name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    service_dict = load_fixture('aws_services.json')
+    samples = load_fixture('tagging_samples.json')
+    tagger = ServiceTagger(service_dict)
+
+    tagged = agreed = 0
+    for sample in samples:
+        tag = tagger.tag(sample['title'], sample['content'])
+        if tag is None:
+            status = 'llm'
+        else:
+            tagged += 1
+            if tag == sample['expected']:
+                agreed += 1
+                status = 'ok'
+            else:
+                status = 'MISS'
+        print('%-4s %-24s expected=%-24s %s' % (status, tag, sample['expected'], sample['title']))
+
+    print()
+    print('tagged locally (LLM calls avoided): %d/%d (%.0f%%)' % (tagged, len(samples), 100 * tagged / len(samples)))
+    if tagged:
+        print('agreement with labels: %d/%d (%.0f%%)' % (agreed, tagged, 100 * agreed / tagged))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+import urllib.parse
+from datetime import datetime, timedelta
+
+# 状態ストア上の既出記事インデックスのキー
+SEEN_INDEX_KEY = "seen-articles"
+
+# ウォーターマークより前に公開日時が設定された記事も拾うための猶予
+WATERMARK_GRACE = timedelta(days=1)
+
+# 正規化時に取り除くトラッキング用クエリパラメータ
+TRACKING_PARAMS = ('utm_', 'trk', 'sc_')
+
+
+def canonical_link(link):
+    """
+    記事のリンクを正規化する関数
+
+    スキームとホストを小文字にし、フラグメント、トラッキング用パラメータ、
+    末尾のスラッシュを取り除く。
+
+    Args:
+        link (str): 記事のリンク
+
+    Returns:
+        str: 正規化されたリンク
+    """
+    parts = urllib.parse.urlsplit(link.strip())
+    query = [
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        path,
+        urllib.parse.urlencode(query),
+        ''
+    ))
+
+
+def entry_keys(entry):
+    """
+    フィードのエントリを識別するキーのリストを返す関数
+
+    Args:
+        entry (FeedParserDict): フィードのエントリ
+
+    Returns:
+        list: 正規化リンクと GUID に基づくキーのリスト
+    """
+    keys = []
+    link = entry.get('link')
+    if link:
+        keys.append('link:' + canonical_link(link))
+    guid = entry.get('id')
+    if guid:
+        keys.append('guid:' + guid)
+    return keys
+
+
+def pending_key(link):
+    """
+    処理待ちの記事のキーを返す関数
+
+    Args:
+        link (str): 記事のリンク
+
+    Returns:
+        str: 正規化リンクに基づくキー
+    """
+    return 'link:' + canonical_link(link)
+
+
+class SeenArticleIndex:
+    """
+    Notion に追加された（またはキューに入った）記事のインデックスと、最後に成功した取得時刻（ウォーターマーク）
+
+    後続処理へ渡した記事は、処理の成功が記録されるまで処理待ち（pending）として保持し、
+    次回の実行でも渡し直す。
+    """
+
+    def __init__(self, seen=None, watermark=None, pending=None):
+        self.seen = seen or {}
+        self.watermark = watermark
+        self.pending = pending or {}
+
+    @classmethod
+    def load(cls, state_store):
+        """
+        状態ストアからインデックスを読み込む
+
+        Args:
+            state_store (StateStore): 状態ストア
+
+        Returns:
+            SeenArticleIndex: 読み込んだインデックス
+        """
+        state = state_store.get(SEEN_INDEX_KEY) or {}
+        watermark = state.get('watermark')
+        return cls(
+            seen=state.get('seen'),
+            watermark=datetime.fromisoformat(watermark) if watermark else None,
+            pending=state.get('pending')
+        )
+
+    def save(self, state_store):
+        state_store.put(SEEN_INDEX_KEY, {
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'seen': self.seen,
+            'pending': self.pending
+        })
+
+    def cutoff(self, safety_bound):
+        """
+        記事を対象とする公開日時の下限を返す
+
+        Args:
+            safety_bound (datetime): これより古い記事は常に対象外とする日時
+
+        Returns:
+            datetime: 公開日時の下限
+        """
+        if self.watermark is None:
+            return safety_bound
+        return max(safety_bound, self.watermark - WATERMARK_GRACE)
+
+    def is_seen(self, entry):
+        return any(key in self.seen for key in entry_keys(entry))
+
+    def add_pending(self, entry, article):
+        """
+        後続処理へ渡す記事を処理待ちとして記録する
+
+        Args:
+            entry (FeedParserDict): フィードのエントリ
+            article (dict): 後続処理へ渡す記事の情報（title、link、published）
+        """
+        self.pending[pending_key(article['link'])] = {
+            'article': article,
+            'keys': entry_keys(entry)
+        }
+
+    def pending_articles(self):
+        """
+        処理待ちの記事を返す
+
+        Returns:
+            list: 後続処理へ渡す記事の情報のリスト
+        """
+        return [record['article'] for record in self.pending.values()]
+
+    def confirm(self, link):
+        """
+        処理に成功した記事を処理待ちから既出に移す
+
+        Args:
+            link (str): 記事のリンク
+
+        Returns:
+            bool: 処理待ちの記事だった場合はTrue
+        """
+        record = self.pending.pop(pending_key(link), None)
+        if record is None:
+            return False
+        for key in record['keys']:
+            self.seen[key] = record['article']['published']
+        return True
+
+    def prune(self, cutoff, pending_cutoff):
+        """
+        公開日時が下限より古い記事をインデックスから取り除く
+
+        処理待ちの記事は、ウォーターマークが進んでも渡し直せるよう別の下限で取り除く。
+
+        Args:
+            cutoff (datetime): 既出の記事の公開日時の下限
+            pending_cutoff (datetime): 処理待ちの記事の公開日時の下限
+        """
+        self.seen = {
+            key: published for key, published in self.seen.items()
+            if datetime.fromisoformat(published) >= cutoff
+        }
+        self.pending = {
+            key: record for key, record in self.pending.items()
+            if datetime.fromisoformat(record['article']['published']) >= pending_cutoff
+        }
@@ -0,0 +1,129 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Parameter Store の値をキャッシュする秒数（ウォームスタート間で共有される）
+PARAMETER_CACHE_TTL = 300
+
+# GetParameters で一度に取得できるパラメータ数の上限
+GET_PARAMETERS_MAX_NAMES = 10
+
+# パラメータ名 -> (値, 取得時刻)
+_parameter_cache = {}
+_parameter_lock = threading.Lock()
+_ssm_client = None
+
+def log_debug(message, **kwargs):
+    _log("DEBUG", message, **kwargs)
+
+def log_info(message, **kwargs):
+    _log("INFO", message, **kwargs)
+
+def log_error(message, **kwargs):
+    _log("ERROR", message, **kwargs)
+
+def _log(level, message, **kwargs):
+    log_entry = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "level": level,
+        "message": message
+    }
+    for key, value in kwargs.items():
+        if isinstance(value, bytes):
+            log_entry[key] = value.decode('utf-8', errors='replace')
+        elif isinstance(value, (int, float, str, bool, type(None))):
+            log_entry[key] = value
+        else:
+            log_entry[key] = str(value)
+    
+    log_message = json.dumps(log_entry, ensure_ascii=False)
+    
+    if level == "ERROR":
+        logger.error(log_message)
+    elif level == "INFO":
+        logger.info(log_message)
+    else:
+        logger.debug(log_message)
+
+def get_parameter(name):
+    """
+    AWS Systems Manager Parameter Storeからパラメータを取得する関数
+
+    取得した値は PARAMETER_CACHE_TTL 秒の間キャッシュする。
+
+    Args:
+        name (str): パラメータ名
+
+    Returns:
+        str: パラメータの値
+
+    Raises:
+        ClientError: Parameter Storeへのアクセス中にエラーが発生した場合
+    """
+    return get_parameters([name])[name]
+
+def get_parameters(names):
+    """
+    AWS Systems Manager Parameter Storeから複数のパラメータをまとめて取得する関数
+
+    キャッシュにない、または期限切れのパラメータだけを GetParameters で取得する。
+
+    Args:
+        names (list): パラメータ名のリスト
+
+    Returns:
+        dict: パラメータ名と値の辞書
+
+    Raises:
+        ClientError: Parameter Storeへのアクセス中にエラーが発生した場合、
+            またはパラメータが存在しない場合
+    """
+    global _ssm_client
+    with _parameter_lock:
+        now = time.monotonic()
+        missing = [
+            name for name in dict.fromkeys(names)
+            if name not in _parameter_cache or now - _parameter_cache[name][1] >= PARAMETER_CACHE_TTL
+        ]
+        if missing:
+            if _ssm_client is None:
+                _ssm_client = boto3.client('ssm')
+            for i in range(0, len(missing), GET_PARAMETERS_MAX_NAMES):
+                chunk = missing[i:i + GET_PARAMETERS_MAX_NAMES]
+                try:
+                    response = _ssm_client.get_parameters(Names=chunk, WithDecryption=True)
+                except ClientError as e:
+                    log_error(f"Error retrieving parameters {', '.join(chunk)}", error=str(e))
+                    raise
+                if response.get('InvalidParameters'):
+                    invalid = ', '.join(response['InvalidParameters'])
+                    log_error(f"Error retrieving parameters {invalid}", error="ParameterNotFound")
+                    raise ClientError(
+                        {'Error': {'Code': 'ParameterNotFound', 'Message': f"Parameters not found: {invalid}"}},
+                        'GetParameters'
+                    )
+                for parameter in response['Parameters']:
+                    _parameter_cache[parameter['Name']] = (parameter['Value'], now)
+            log_debug("Parameters retrieved", parameter_count=len(missing))
+        return {name: _parameter_cache[name][0] for name in names}
+
+def invalidate_parameters(*names):
+    """
+    キャッシュしたパラメータを破棄する関数
+
+    認証エラーなどで値が古くなった可能性がある場合に呼び出し、次回の取得で最新の値を読み込む。
+
+    Args:
+        *names (str): 破棄するパラメータ名
+    """
+    with _parameter_lock:
+        for name in names:
+            _parameter_cache.pop(name, None)
+    log_info("Parameter cache invalidated", parameters=', '.join(names))
@@ -25,7 +25,7 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE."""
 
-from .api import parse
+from .api import parse, iterparse
 from .datetimes import registerDateHandler
 from .exceptions import *
 from .util import FeedParserDict
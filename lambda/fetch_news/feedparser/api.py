@@ -53,6 +53,21 @@ PREFERRED_XML_PARSERS = ["drv_libxml2"]
 
 _XML_AVAILABLE = True
 
+# Named parse profiles, selected with the ``profile`` argument of parse() and
+# iterparse().  Each profile maps parser attributes to the value they take;
+# attributes that are not listed keep their defaults.
+PROFILES = {
+    'default': {},
+    # Well-formed feeds from a trusted source, when only the basic entry
+    # fields (title, link, dates) are needed.
+    'trusted': {
+        'sanitize_html': False,
+        'resolve_relative_uris': False,
+        'sync_authors': False,
+        'handled_namespaces': frozenset(['', 'dc', 'dcterms', 'content']),
+    },
+}
+
 SUPPORTED_VERSIONS = {
     '': 'unknown',
     'rss090': 'RSS 0.90',
@@ -149,7 +164,7 @@ StrictFeedParser = type(
 )
 
 
-def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, referrer=None, handlers=None, request_headers=None, response_headers=None, resolve_relative_uris=None, sanitize_html=None):
+def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, referrer=None, handlers=None, request_headers=None, response_headers=None, resolve_relative_uris=None, sanitize_html=None, profile=None, compact_entries=None):
     """Parse a feed from a URL, file, stream, or string.
 
     :param url_file_stream_or_string:
@@ -192,18 +207,172 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
         Should feedparser skip HTML sanitization? Only disable this if you know
         what you are doing!  Defaults to the value of
         :data:`feedparser.SANITIZE_HTML`, which is ``True``.
+    :param str profile:
+        Name of a parse profile in :data:`PROFILES` that sets the defaults
+        for the options above and for the internal parser options.  The
+        ``trusted`` profile turns off sanitizing, relative URI resolution,
+        author/contributor syncing and the handlers for namespaces other
+        than core RSS/Atom, Dublin Core and ``content``.  Only use it for
+        well-formed feeds from a source you trust.  Explicit
+        ``resolve_relative_uris`` and ``sanitize_html`` arguments still
+        take precedence.
+    :param bool compact_entries:
+        Replace each finished entry with a slot-based
+        :class:`feedparser.util.CompactEntry` that keeps only the id, title,
+        link, summary and date fields.  This saves memory when many entries
+        are kept around.  Defaults to ``False``.
 
     :return: A :class:`FeedParserDict`.
     """
 
-    if not agent or sanitize_html is None or resolve_relative_uris is None:
+    result, prepared = _prepare(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, response_headers, resolve_relative_uris, sanitize_html, profile, compact_entries)
+    if prepared is None:
+        return result
+    data, entities, baseuri, baselang, use_strict_parser, parser_options = prepared
+
+    if use_strict_parser:
+        # initialize the SAX parser
+        feedparser = _configure(StrictFeedParser(baseuri, baselang, 'utf-8'), parser_options)
+        saxparser = _make_sax_parser(feedparser)
+        source = xml.sax.xmlreader.InputSource()
+        source.setByteStream(io.BytesIO(data))
+        try:
+            saxparser.parse(source)
+        except xml.sax.SAXException as e:
+            result['bozo'] = 1
+            result['bozo_exception'] = feedparser.exc or e
+            use_strict_parser = 0
+    if not use_strict_parser:
+        feedparser = _configure(LooseFeedParser(baseuri, baselang, 'utf-8', entities), parser_options)
+        feedparser.feed(data.decode('utf-8', 'replace'))
+    result['feed'] = feedparser.feeddata
+    result['entries'] = feedparser.entries
+    result['version'] = result['version'] or feedparser.version
+    result['namespaces'] = feedparser.namespaces_in_use
+    return result
+
+
+def iterparse(url_file_stream_or_string, etag=None, modified=None, agent=None, referrer=None, handlers=None, request_headers=None, response_headers=None, resolve_relative_uris=None, sanitize_html=None, profile=None, compact_entries=None):
+    """Parse a feed, yielding entries as soon as they have been parsed.
+
+    Accepts the same arguments as :func:`parse`. The document is still
+    downloaded in full, but the strict parser is fed incrementally and each
+    entry is handed to the caller as soon as its closing tag has been seen.
+    Entries are not kept by the parser once they have been yielded, and
+    parsing stops as soon as the caller stops iterating, so a caller that
+    only wants the newest entries of a reverse-chronological feed can
+    ``break`` out of the loop without paying for the rest of the document.
+
+    If the strict parser fails part-way through, the document is re-parsed
+    with the loose parser and only the entries that have not been yielded
+    yet are produced.
+
+    :return: A :class:`FeedParserDict` whose ``entries`` value is an iterator.
+        ``feed``, ``version`` and ``namespaces`` are filled in as the
+        iterator advances.
+    """
+
+    result, prepared = _prepare(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, response_headers, resolve_relative_uris, sanitize_html, profile, compact_entries)
+    if prepared is None:
+        result['entries'] = (entry for entry in result['entries'])
+        return result
+    result['entries'] = _iter_entries(result, *prepared)
+    return result
+
+
+# Number of bytes handed to the incremental SAX parser at a time by iterparse().
+ITERPARSE_CHUNK_SIZE = 16384
+
+
+def _iter_entries(result, data, entities, baseuri, baselang, use_strict_parser, parser_options):
+    yielded = 0
+    if use_strict_parser:
+        feedparser = _configure(StrictFeedParser(baseuri, baselang, 'utf-8'), parser_options)
+        result['feed'] = feedparser.feeddata
+        result['namespaces'] = feedparser.namespaces_in_use
+        saxparser = _make_sax_parser(feedparser)
+        try:
+            for offset in range(0, len(data), ITERPARSE_CHUNK_SIZE):
+                saxparser.feed(data[offset:offset + ITERPARSE_CHUNK_SIZE])
+                result['version'] = result['version'] or feedparser.version
+                for entry in _pop_complete_entries(feedparser):
+                    yielded += 1
+                    yield entry
+            saxparser.close()
+        except xml.sax.SAXException as e:
+            result['bozo'] = 1
+            result['bozo_exception'] = feedparser.exc or e
+            use_strict_parser = 0
+        else:
+            result['version'] = result['version'] or feedparser.version
+            for entry in _pop_complete_entries(feedparser):
+                yield entry
+    if not use_strict_parser:
+        feedparser = _configure(LooseFeedParser(baseuri, baselang, 'utf-8', entities), parser_options)
+        feedparser.feed(data.decode('utf-8', 'replace'))
+        result['feed'] = feedparser.feeddata
+        result['version'] = result['version'] or feedparser.version
+        result['namespaces'] = feedparser.namespaces_in_use
+        for entry in feedparser.entries[yielded:]:
+            yield entry
+
+
+def _pop_complete_entries(feedparser):
+    # The entry currently being parsed is always the last one in the list.
+    count = len(feedparser.entries) - (1 if feedparser.inentry else 0)
+    if count <= 0:
+        return []
+    complete = feedparser.entries[:count]
+    del feedparser.entries[:count]
+    for entry in complete:
+        feedparser.property_depth_map.pop(entry, None)
+    return complete
+
+
+def _configure(feedparser, parser_options):
+    for name, value in parser_options.items():
+        setattr(feedparser, name, value)
+    return feedparser
+
+
+def _make_sax_parser(feedparser):
+    saxparser = xml.sax.make_parser(PREFERRED_XML_PARSERS)
+    saxparser.setFeature(xml.sax.handler.feature_namespaces, 1)
+    try:
+        # disable downloading external doctype references, if possible
+        saxparser.setFeature(xml.sax.handler.feature_external_ges, 0)
+    except xml.sax.SAXNotSupportedException:
+        pass
+    saxparser.setContentHandler(feedparser)
+    saxparser.setErrorHandler(feedparser)
+    return saxparser
+
+
+def _prepare(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, response_headers, resolve_relative_uris, sanitize_html, profile, compact_entries):
+    """Fetch and normalize a document before it is handed to a parser.
+
+    :return: A ``(result, prepared)`` tuple. ``prepared`` is ``None`` when
+        there is nothing to parse (for example on HTTP 304 or a network
+        error), in which case ``result`` is complete.
+    """
+
+    try:
+        parser_options = dict(PROFILES[profile or 'default'])
+    except KeyError:
+        raise ValueError('unknown parse profile: %r' % profile)
+    if sanitize_html is not None:
+        parser_options['sanitize_html'] = sanitize_html
+    if resolve_relative_uris is not None:
+        parser_options['resolve_relative_uris'] = resolve_relative_uris
+    if compact_entries is not None:
+        parser_options['compact_entries'] = compact_entries
+
+    if not agent or 'sanitize_html' not in parser_options or 'resolve_relative_uris' not in parser_options:
         import feedparser
     if not agent:
         agent = feedparser.USER_AGENT
-    if sanitize_html is None:
-        sanitize_html = feedparser.SANITIZE_HTML
-    if resolve_relative_uris is None:
-        resolve_relative_uris = feedparser.RESOLVE_RELATIVE_URIS
+    parser_options.setdefault('sanitize_html', feedparser.SANITIZE_HTML)
+    parser_options.setdefault('resolve_relative_uris', feedparser.RESOLVE_RELATIVE_URIS)
 
     result = FeedParserDict(
         bozo=False,
@@ -219,10 +388,10 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
             'bozo': True,
             'bozo_exception': error,
         })
-        return result
+        return result, None
 
     if not data:
-        return result
+        return result, None
 
     # overwrite existing headers using response_headers
     result['headers'].update(response_headers or {})
@@ -243,35 +412,4 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
 
     if not _XML_AVAILABLE:
         use_strict_parser = 0
-    if use_strict_parser:
-        # initialize the SAX parser
-        feedparser = StrictFeedParser(baseuri, baselang, 'utf-8')
-        feedparser.resolve_relative_uris = resolve_relative_uris
-        feedparser.sanitize_html = sanitize_html
-        saxparser = xml.sax.make_parser(PREFERRED_XML_PARSERS)
-        saxparser.setFeature(xml.sax.handler.feature_namespaces, 1)
-        try:
-            # disable downloading external doctype references, if possible
-            saxparser.setFeature(xml.sax.handler.feature_external_ges, 0)
-        except xml.sax.SAXNotSupportedException:
-            pass
-        saxparser.setContentHandler(feedparser)
-        saxparser.setErrorHandler(feedparser)
-        source = xml.sax.xmlreader.InputSource()
-        source.setByteStream(io.BytesIO(data))
-        try:
-            saxparser.parse(source)
-        except xml.sax.SAXException as e:
-            result['bozo'] = 1
-            result['bozo_exception'] = feedparser.exc or e
-            use_strict_parser = 0
-    if not use_strict_parser:
-        feedparser = LooseFeedParser(baseuri, baselang, 'utf-8', entities)
-        feedparser.resolve_relative_uris = resolve_relative_uris
-        feedparser.sanitize_html = sanitize_html
-        feedparser.feed(data.decode('utf-8', 'replace'))
-    result['feed'] = feedparser.feeddata
-    result['entries'] = feedparser.entries
-    result['version'] = result['version'] or feedparser.version
-    result['namespaces'] = feedparser.namespaces_in_use
-    return result
+    return result, (data, entities, baseuri, baselang, use_strict_parser, parser_options)
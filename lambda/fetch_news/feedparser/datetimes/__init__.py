@@ -25,6 +25,9 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import functools
+import string
+
 from .asctime import _parse_date_asctime
 from .greek import _parse_date_greek
 from .hungarian import _parse_date_hungarian
@@ -36,26 +39,70 @@ from .w3dtf import _parse_date_w3dtf
 
 _date_handlers = []
 
+# Maps the "shape" of a date string (see _date_shape()) to the handler that
+# parsed the last string with that shape.  A feed almost always uses a single
+# date format, so that handler is tried first for the following strings
+# instead of walking the whole handler list again.
+_handlers_by_shape = {}
+_MAX_SHAPES = 64
+
+# Number of parsed date strings to remember.  published/updated values are
+# frequently repeated within and across feeds.
+DATE_CACHE_SIZE = 1024
+
+_SHAPE_TABLE = str.maketrans(
+    string.digits + string.ascii_letters,
+    '0' * len(string.digits) + 'a' * len(string.ascii_letters),
+)
+
 
 def registerDateHandler(func):
     """Register a date handler function (takes string, returns 9-tuple date in GMT)"""
     _date_handlers.insert(0, func)
+    _handlers_by_shape.clear()
+    _parse_date_cached.cache_clear()
+
+
+def _date_shape(date_string):
+    return date_string.translate(_SHAPE_TABLE)
+
+
+def _try_handler(handler, date_string):
+    try:
+        date9tuple = handler(date_string)
+    except (KeyError, OverflowError, ValueError, AttributeError):
+        return None
+    if not date9tuple:
+        return None
+    if len(date9tuple) != 9:
+        return None
+    return date9tuple
 
 
 def _parse_date(date_string):
     """Parses a variety of date formats into a 9-tuple in GMT"""
     if not date_string:
         return None
+    return _parse_date_cached(date_string)
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_cached(date_string):
+    shape = _date_shape(date_string)
+    known_handler = _handlers_by_shape.get(shape)
+    if known_handler is not None:
+        date9tuple = _try_handler(known_handler, date_string)
+        if date9tuple:
+            return date9tuple
     for handler in _date_handlers:
-        try:
-            date9tuple = handler(date_string)
-        except (KeyError, OverflowError, ValueError, AttributeError):
-            continue
-        if not date9tuple:
-            continue
-        if len(date9tuple) != 9:
+        if handler is known_handler:
             continue
-        return date9tuple
+        date9tuple = _try_handler(handler, date_string)
+        if date9tuple:
+            if len(_handlers_by_shape) >= _MAX_SHAPES:
+                _handlers_by_shape.clear()
+            _handlers_by_shape[shape] = handler
+            return date9tuple
     return None
 
 
@@ -34,7 +34,7 @@ import xml.sax.saxutils
 
 from .html import _cp1252
 from .namespaces import _base, cc, dc, georss, itunes, mediarss, psc
-from .sanitizer import _sanitize_html, _HTMLSanitizer
+from .sanitizer import _resolve_and_sanitize_html, _sanitize_html, _HTMLSanitizer
 from .util import FeedParserDict
 from .urls import _urljoin, make_safe_absolute_uri, resolve_relative_uris
 
@@ -162,6 +162,17 @@ class _FeedParserMixin(
         'text/html',
     }
 
+    # Parser options that can be changed by a parse profile (see api.PROFILES).
+    # When sync_authors is false, author details and contributors are not
+    # collected.  When handled_namespaces is not None, elements whose prefix
+    # is not in the set are stored as unknown elements instead of being
+    # dispatched to their namespace handler.
+    sync_authors = True
+    handled_namespaces = None
+    # When compact_entries is true, finished entries are replaced with
+    # util.CompactEntry records.
+    compact_entries = False
+
     def __init__(self):
         if not self._matchnamespaces:
             for k, v in self.namespaces.items():
@@ -286,6 +297,8 @@ class _FeedParserMixin(
         # call special handler (if defined) or default handler
         methodname = '_start_' + prefix + suffix
         try:
+            if not self._handles_prefix(prefix):
+                raise AttributeError()
             method = getattr(self, methodname)
             return method(attrs_d)
         except AttributeError:
@@ -315,7 +328,7 @@ class _FeedParserMixin(
         # call special handler (if defined) or default handler
         methodname = '_end_' + prefix + suffix
         try:
-            if self.svgOK:
+            if self.svgOK or not self._handles_prefix(prefix):
                 raise AttributeError()
             method = getattr(self, methodname)
             method()
@@ -344,6 +357,11 @@ class _FeedParserMixin(
 
         self.depth -= 1
 
+    def _handles_prefix(self, prefix):
+        if self.handled_namespaces is None:
+            return True
+        return prefix[:-1] in self.handled_namespaces
+
     def handle_charref(self, ref):
         # Called for each character reference, e.g. for '&#160;', ref is '160'
         if not self.elementstack:
@@ -537,15 +555,19 @@ class _FeedParserMixin(
             pass
 
         is_htmlish = self.map_content_type(self.contentparams.get('type', 'text/html')) in self.html_types
+        resolve = is_htmlish and self.resolve_relative_uris and element in self.can_contain_relative_uris
+        sanitize = is_htmlish and self.sanitize_html and element in self.can_contain_dangerous_markup
+        if resolve and sanitize:
+            # resolve relative URIs and sanitize in a single pass
+            output = _resolve_and_sanitize_html(output, self.baseuri, self.encoding, self.contentparams.get('type', 'text/html'))
+
         # resolve relative URIs within embedded markup
-        if is_htmlish and self.resolve_relative_uris:
-            if element in self.can_contain_relative_uris:
-                output = resolve_relative_uris(output, self.baseuri, self.encoding, self.contentparams.get('type', 'text/html'))
+        elif resolve:
+            output = resolve_relative_uris(output, self.baseuri, self.encoding, self.contentparams.get('type', 'text/html'))
 
         # sanitize embedded markup
-        if is_htmlish and self.sanitize_html:
-            if element in self.can_contain_dangerous_markup:
-                output = _sanitize_html(output, self.encoding, self.contentparams.get('type', 'text/html'))
+        elif sanitize:
+            output = _sanitize_html(output, self.encoding, self.contentparams.get('type', 'text/html'))
 
         if self.encoding and isinstance(output, bytes):
             output = output.decode(self.encoding, 'ignore')
@@ -716,6 +738,10 @@ class _FeedParserMixin(
 
     def _save_author(self, key, value, prefix='author'):
         context = self._get_context()
+        if not self.sync_authors:
+            context.setdefault('authors', [FeedParserDict()])
+            context['authors'][-1][key] = value
+            return
         context.setdefault(prefix + '_detail', FeedParserDict())
         context[prefix + '_detail'][key] = value
         self._sync_author_detail()
@@ -723,11 +749,15 @@ class _FeedParserMixin(
         context['authors'][-1][key] = value
 
     def _save_contributor(self, key, value):
+        if not self.sync_authors:
+            return
         context = self._get_context()
         context.setdefault('contributors', [FeedParserDict()])
         context['contributors'][-1][key] = value
 
     def _sync_author_detail(self, key='author'):
+        if not self.sync_authors:
+            return
         context = self._get_context()
         detail = context.get('%ss' % key, [FeedParserDict()])[-1]
         if detail:
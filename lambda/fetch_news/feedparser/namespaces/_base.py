@@ -30,7 +30,7 @@ import copy
 
 from ..datetimes import _parse_date
 from ..urls import make_safe_absolute_uri
-from ..util import FeedParserDict
+from ..util import CompactEntry, FeedParserDict
 
 
 class Namespace(object):
@@ -260,6 +260,10 @@ class Namespace(object):
         self.pop('item')
         self.inentry = 0
         self.hasContent = 0
+        if self.compact_entries and self.entries and isinstance(self.entries[-1], FeedParserDict):
+            entry = self.entries[-1]
+            self.property_depth_map.pop(entry, None)
+            self.entries[-1] = CompactEntry.from_entry(entry)
     _end_entry = _end_item
 
     def _start_language(self, attrs_d):
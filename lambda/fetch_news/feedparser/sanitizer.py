@@ -28,11 +28,31 @@
 import re
 
 from .html import _BaseHTMLProcessor
-from .urls import make_safe_absolute_uri
+from .urls import RelativeURIResolver, make_safe_absolute_uri
+
+# The patterns below are compiled once at import rather than once per
+# sanitized style attribute or comment.
+
+# Match url() values in style attributes.
+RE_STYLE_URL_PATTERN = re.compile(r'url\s*\(\s*[^\s)]+?\s*\)\s*')
+
+# Match style attributes made up only of safe characters.
+RE_STYLE_GAUNTLET_PATTERN = re.compile(
+    r"""^([:,;#%.\sa-zA-Z0-9!]|\w-\w|'[\s\w]+'|"[\s\w]+"|\([\d,\s]+\))*$"""
+)
+
+# Match a single CSS declaration, including the trailing semicolon.
+RE_STYLE_DECLARATION_PATTERN = re.compile(r"\s*[-\w]+\s*:\s*[^:;]*;?")
+
+# Match a CSS property and its value.
+RE_STYLE_PROPERTY_PATTERN = re.compile(r"([-\w]+)\s*:\s*([^:;]*)")
+
+# Match the end of a malformed comment.
+RE_COMMENT_END_PATTERN = re.compile(r'--[^>]*>')
 
 
 class _HTMLSanitizer(_BaseHTMLProcessor):
-    acceptable_elements = {
+    acceptable_elements = frozenset({
         'a',
         'abbr',
         'acronym',
@@ -133,9 +153,9 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'ul',
         'var',
         'video',
-    }
+    })
 
-    acceptable_attributes = {
+    acceptable_attributes = frozenset({
         'abbr',
         'accept',
         'accept-charset',
@@ -277,15 +297,15 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'width',
         'wrap',
         'xml:lang',
-    }
+    })
 
-    unacceptable_elements_with_end_tag = {
+    unacceptable_elements_with_end_tag = frozenset({
         'applet',
         'script',
         'style',
-    }
+    })
 
-    acceptable_css_properties = {
+    acceptable_css_properties = frozenset({
         'azimuth',
         'background-color',
         'border-bottom-color',
@@ -332,10 +352,10 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'volume',
         'white-space',
         'width',
-    }
+    })
 
     # survey of common keywords found in feeds
-    acceptable_css_keywords = {
+    acceptable_css_keywords = frozenset({
         '!important',
         'aqua',
         'auto',
@@ -375,7 +395,7 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'underline',
         'white',
         'yellow',
-    }
+    })
 
     valid_css_values = re.compile(
         r'^('
@@ -385,7 +405,7 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         r')$'
     )
 
-    mathml_elements = {
+    mathml_elements = frozenset({
         'annotation',
         'annotation-xml',
         'maction',
@@ -430,9 +450,9 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'munderover',
         'none',
         'semantics',
-    }
+    })
 
-    mathml_attributes = {
+    mathml_attributes = frozenset({
         'accent',
         'accentunder',
         'actiontype',
@@ -532,10 +552,10 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'xlink:type',
         'xmlns',
         'xmlns:xlink',
-    }
+    })
 
     # svgtiny - foreignObject + linearGradient + radialGradient + stop
-    svg_elements = {
+    svg_elements = frozenset({
         'a',
         'animate',
         'animateColor',
@@ -571,10 +591,10 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'title',
         'tspan',
         'use',
-    }
+    })
 
     # svgtiny + class + opacity + offset + xmlns + xmlns:xlink
-    svg_attributes = {
+    svg_attributes = frozenset({
         'accent-height',
         'accumulate',
         'additive',
@@ -715,12 +735,17 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'y1',
         'y2',
         'zoomAndPan',
-    }
+    })
 
-    svg_attr_map = None
-    svg_elem_map = None
+    # For most vocabularies, lowercasing is a good idea. Many svg elements
+    # and attributes, however, are camel case, so match the lowercased names
+    # the parser reports and map them back when writing the tag out.
+    svg_attr_map = {a.lower(): a for a in svg_attributes if a != a.lower()}
+    svg_elem_map = {a.lower(): a for a in svg_elements if a != a.lower()}
+    svg_attributes = frozenset(a.lower() for a in svg_attributes)
+    svg_elements = frozenset(a.lower() for a in svg_elements)
 
-    acceptable_svg_properties = {
+    acceptable_svg_properties = frozenset({
         'fill',
         'fill-opacity',
         'fill-rule',
@@ -729,7 +754,7 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
         'stroke-linejoin',
         'stroke-opacity',
         'stroke-width',
-    }
+    })
 
     def __init__(self, encoding=None, _type='application/xhtml+xml'):
         super(_HTMLSanitizer, self).__init__(encoding, _type)
@@ -769,18 +794,6 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
             if self.mathmlOK and tag in self.mathml_elements:
                 acceptable_attributes = self.mathml_attributes
             elif self.svgOK and tag in self.svg_elements:
-                # For most vocabularies, lowercasing is a good idea. Many
-                # svg elements, however, are camel case.
-                if not self.svg_attr_map:
-                    lower = [attr.lower() for attr in self.svg_attributes]
-                    mix = [a for a in self.svg_attributes if a not in lower]
-                    self.svg_attributes = lower
-                    self.svg_attr_map = {a.lower(): a for a in mix}
-
-                    lower = [attr.lower() for attr in self.svg_elements]
-                    mix = [a for a in self.svg_elements if a not in lower]
-                    self.svg_elements = lower
-                    self.svg_elem_map = {a.lower(): a for a in mix}
                 acceptable_attributes = self.svg_attributes
                 tag = self.svg_elem_map.get(tag, tag)
                 keymap = self.svg_attr_map
@@ -807,6 +820,15 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
                 clean_attrs.append((key, value))
         super(_HTMLSanitizer, self).unknown_starttag(tag, clean_attrs)
 
+    # There are no start_*, do_* or end_* handlers here, so skip SGMLParser's
+    # failing handler lookups and dispatch every tag directly.
+    def finish_starttag(self, tag, attrs):
+        self.unknown_starttag(tag, attrs)
+        return -1
+
+    def finish_endtag(self, tag):
+        self.unknown_endtag(tag)
+
     def unknown_endtag(self, tag):
         if tag not in self.acceptable_elements:
             if tag in self.unacceptable_elements_with_end_tag:
@@ -834,23 +856,23 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
 
     def sanitize_style(self, style):
         # disallow urls
-        style = re.compile(r'url\s*\(\s*[^\s)]+?\s*\)\s*').sub(' ', style)
+        style = RE_STYLE_URL_PATTERN.sub(' ', style)
 
         # gauntlet
-        if not re.match(r"""^([:,;#%.\sa-zA-Z0-9!]|\w-\w|'[\s\w]+'|"[\s\w]+"|\([\d,\s]+\))*$""", style):
+        if not RE_STYLE_GAUNTLET_PATTERN.match(style):
             return ''
         # This replaced a regexp that used re.match and was prone to
         # pathological back-tracking.
-        if re.sub(r"\s*[-\w]+\s*:\s*[^:;]*;?", '', style).strip():
+        if RE_STYLE_DECLARATION_PATTERN.sub('', style).strip():
             return ''
 
         clean = []
-        for prop, value in re.findall(r"([-\w]+)\s*:\s*([^:;]*)", style):
+        for prop, value in RE_STYLE_PROPERTY_PATTERN.findall(style):
             if not value:
                 continue
             if prop.lower() in self.acceptable_css_properties:
                 clean.append(prop + ': ' + value + ';')
-            elif prop.split('-')[0].lower() in ['background', 'border', 'margin', 'padding']:
+            elif prop.split('-')[0].lower() in {'background', 'border', 'margin', 'padding'}:
                 for keyword in value.split():
                     if (
                             keyword not in self.acceptable_css_keywords
@@ -870,22 +892,61 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
             return ret
         # if ret == -1, this may be a malicious attempt to circumvent
         # sanitization, or a page-destroying unclosed comment
-        match = re.compile(r'--[^>]*>').search(self.rawdata, i+4)
+        match = RE_COMMENT_END_PATTERN.search(self.rawdata, i+4)
         if match:
             return match.end()
         # unclosed comment; deliberately fail to handle_data()
         return len(self.rawdata)
 
 
-def _sanitize_html(html_source, encoding, _type):
-    p = _HTMLSanitizer(encoding, _type)
-    html_source = html_source.replace('<![CDATA[', '&lt;![CDATA[')
+class _RelativeURIResolvingSanitizer(_HTMLSanitizer):
+    """Resolve relative URIs and sanitize in a single parsing pass.
+
+    This produces the same markup as running the output of
+    :class:`RelativeURIResolver` through :class:`_HTMLSanitizer`, without
+    serializing and re-tokenizing the document in between.
+
+    The one exception is markup after a comment that is not closed by
+    ``-->`` (e.g. one ending in ``--!>``).  RelativeURIResolver passes
+    everything after such a comment through unparsed, so the two-pass
+    pipeline leaves those URIs relative; the sanitizer recovers at the
+    comment's end, so this class resolves them.
+    """
+
+    relative_uris = RelativeURIResolver.relative_uris
+
+    def __init__(self, baseuri, encoding=None, _type='application/xhtml+xml'):
+        super(_RelativeURIResolvingSanitizer, self).__init__(encoding, _type)
+        self.baseuri = baseuri
+
+    resolve_uri = RelativeURIResolver.resolve_uri
+
+    def unknown_starttag(self, tag, attrs):
+        attrs = self.normalize_attrs(attrs)
+        attrs = [(key, ((tag, key) in self.relative_uris) and self.resolve_uri(value) or value) for key, value in attrs]
+        super(_RelativeURIResolvingSanitizer, self).unknown_starttag(tag, attrs)
+
+
+def _feed_sanitizer(p, html_source):
     p.feed(html_source)
     data = p.output()
     data = data.strip().replace('\r\n', '\n')
     return data
 
 
+def _sanitize_html(html_source, encoding, _type):
+    p = _HTMLSanitizer(encoding, _type)
+    html_source = html_source.replace('<![CDATA[', '&lt;![CDATA[')
+    return _feed_sanitizer(p, html_source)
+
+
+def _resolve_and_sanitize_html(html_source, base_uri, encoding, _type):
+    # CDATA sections are left as-is: like RelativeURIResolver, the parser
+    # drops them, so there is nothing left for the sanitizer to escape.
+    p = _RelativeURIResolvingSanitizer(base_uri, encoding, _type)
+    return _feed_sanitizer(p, html_source)
+
+
 # Match XML entity declarations.
 # Example: <!ENTITY copyright "(C)">
 RE_ENTITY_PATTERN = re.compile(br'^\s*<!ENTITY([^>]*?)>', re.MULTILINE)
@@ -902,6 +963,9 @@ RE_DOCTYPE_PATTERN = re.compile(br'^\s*<!DOCTYPE([^>]*?)>', re.MULTILINE)
 # Forbidden: explode1 "&explode2;&explode2;"
 RE_SAFE_ENTITY_PATTERN = re.compile(br'\s+(\w+)\s+"(&#\w+;|[^&"]*)"')
 
+# Match the first element that doesn't begin with '<?' or '<!'.
+RE_FIRST_ELEMENT_PATTERN = re.compile(br'<\w')
+
 
 def replace_doctype(data):
     """Strips and replaces the DOCTYPE, returns (rss_version, stripped_data)
@@ -912,7 +976,7 @@ def replace_doctype(data):
 
     # Divide the document into two groups by finding the location
     # of the first element that doesn't begin with '<?' or '<!'.
-    start = re.search(br'<\w', data)
+    start = RE_FIRST_ELEMENT_PATTERN.search(data)
     start = start and start.start() or -1
     head, data = data[:start+1], data[start+1:]
 
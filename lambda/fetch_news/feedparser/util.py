@@ -161,3 +161,120 @@ class FeedParserDict(dict):
         # This is incorrect behavior -- dictionaries shouldn't be hashable.
         # Note to self: remove this behavior in the future.
         return id(self)
+
+
+def _resolve_aliases(keymap, fields):
+    """Map each alias in *keymap* to the first of its targets in *fields*.
+
+    :type keymap: dict
+    :type fields: Tuple[str, ...]
+    :rtype: Dict[str, str]
+    """
+
+    aliases = {}
+    for alias, targets in keymap.items():
+        if isinstance(targets, str):
+            targets = [targets]
+        for target in targets:
+            if target in fields:
+                aliases[alias] = target
+                break
+    return aliases
+
+
+class CompactEntry(object):
+    """A slot-based, read-only record of the commonly used entry fields.
+
+    Parsing with ``compact_entries=True`` replaces each finished entry with
+    one of these.  Only the fields in ``fields`` are kept; aliases such as
+    ``guid`` or ``issued_parsed`` are resolved through a table computed once
+    from :attr:`FeedParserDict.keymap`, and ``*_detail`` values are stored
+    as plain tuples and only turned into :class:`FeedParserDict` objects the
+    first time they are read.
+
+    Missing fields raise :exc:`AttributeError` / :exc:`KeyError`, the same
+    as they do on a :class:`FeedParserDict`.  Item access, ``in`` and
+    :meth:`get` only see the stored fields, their aliases and ``*_detail``
+    values, never methods or other attributes of the record.
+
+    The deprecated fallback of :class:`FeedParserDict` from ``updated`` /
+    ``updated_parsed`` to ``published`` / ``published_parsed`` is not
+    reproduced: ``updated`` is missing when the entry had no update date.
+    """
+
+    __slots__ = (
+        'id',
+        'title',
+        'link',
+        'summary',
+        'published',
+        'published_parsed',
+        'updated',
+        'updated_parsed',
+        '_details',
+    )
+
+    fields = __slots__[:-1]
+
+    keymap = _resolve_aliases(FeedParserDict.keymap, fields)
+
+    @classmethod
+    def from_entry(cls, entry):
+        """
+        :type entry: FeedParserDict
+        :rtype: CompactEntry
+        """
+
+        compact = cls()
+        details = {}
+        for name in cls.fields:
+            if dict.__contains__(entry, name):
+                setattr(compact, name, dict.__getitem__(entry, name))
+            detail = dict.get(entry, name + '_detail')
+            if detail is not None:
+                details[name + '_detail'] = tuple(detail.items())
+        compact._details = details
+        return compact
+
+    def __getattr__(self, key):
+        # __getattribute__() is called first; this will be called only for
+        # aliases, *_detail values and fields that are not set
+        if key in self.keymap:
+            return getattr(self, self.keymap[key])
+        if key.endswith('_detail'):
+            detail = self._details.get(key)
+            if isinstance(detail, tuple):
+                detail = self._details[key] = FeedParserDict(detail)
+            if detail is not None:
+                return detail
+        raise AttributeError("object has no attribute '%s'" % key)
+
+    def _lookup(self, key):
+        # restrict item access to the stored fields, so that names such as
+        # 'keys' or 'from_entry' are not found through getattr()
+        if key in self.fields or key in self.keymap or key.endswith('_detail'):
+            return getattr(self, key)
+        raise AttributeError("object has no attribute '%s'" % key)
+
+    def __getitem__(self, key):
+        try:
+            return self._lookup(key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self._lookup(key)
+        except AttributeError:
+            return False
+        else:
+            return True
+
+    def get(self, key, default=None):
+        try:
+            return self._lookup(key)
+        except AttributeError:
+            return default
+
+    def keys(self):
+        return [name for name in self.fields if name in self] + list(self._details)
@@ -0,0 +1,167 @@
+import os
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import feedparser
+
+from article_index import canonical_link
+from common import log_debug, log_error
+
+# AWSのニュースフィードのURL
+AWS_RSS_URL = "https://aws.amazon.com/about-aws/whats-new/recent/feed/"
+
+# 取得対象のフィード一覧（FEED_NAMES 環境変数で上書き可能）
+# ordered が True のフィードは新しい順に並んでいるものとして、下限より古い記事が現れた時点で解析を打ち切る
+FEEDS = [
+    {"name": "whats-new", "url": AWS_RSS_URL, "enabled": True, "ordered": True},
+    {"name": "whats-new-jp", "url": "https://aws.amazon.com/jp/about-aws/whats-new/recent/feed/", "enabled": False, "ordered": True},
+    {"name": "aws-news-blog", "url": "https://aws.amazon.com/blogs/aws/feed/", "enabled": True, "ordered": True},
+    {"name": "security-bulletins", "url": "https://aws.amazon.com/security/security-bulletins/rss/feed/", "enabled": True, "ordered": False},
+]
+
+# フィードごとのソケットタイムアウト（秒）
+FEED_TIMEOUT = 15
+
+# 全フィードの取得を待つ上限（秒）
+FETCH_DEADLINE = 60
+
+MAX_WORKERS = 8
+
+# AWS 公式のフィードは信頼できるため、サニタイズや相対 URI の解決を省いた軽量プロファイルで解析する
+PARSE_PROFILE = "trusted"
+
+
+class _TimeoutHandler(urllib.request.BaseHandler):
+    """
+    feedparser が使う urllib のリクエストにタイムアウトを設定するハンドラ
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def http_request(self, request):
+        request.timeout = self.timeout
+        return request
+
+    https_request = http_request
+
+
+def get_enabled_feeds():
+    """
+    取得対象のフィードを返す関数
+
+    Returns:
+        list: フィード定義のリスト
+    """
+    names = os.environ.get('FEED_NAMES')
+    if names:
+        selected = {name.strip() for name in names.split(',')}
+        return [feed for feed in FEEDS if feed['name'] in selected]
+    return [feed for feed in FEEDS if feed['enabled']]
+
+
+def take_until(entries, cutoff):
+    """
+    公開日時が下限より古いエントリが現れた時点で解析を打ち切る関数
+
+    Args:
+        entries (iterator): feedparser.iterparse が返すエントリのイテレータ
+        cutoff (datetime): 公開日時の下限
+
+    Returns:
+        list: 下限より新しいエントリ（公開日時のないエントリを含む）のリスト
+    """
+    taken = []
+    for entry in entries:
+        published_parsed = entry.get('published_parsed')
+        if published_parsed and datetime(*published_parsed[:6], tzinfo=timezone.utc) < cutoff:
+            break
+        taken.append(entry)
+    entries.close()
+    return taken
+
+
+def fetch_feed(feed, feed_state, cutoff):
+    """
+    1つのフィードを条件付きリクエストで取得する関数
+
+    Args:
+        feed (dict): フィード定義
+        feed_state (dict): 前回取得時の ETag/Last-Modified
+        cutoff (datetime): 公開日時の下限
+
+    Returns:
+        FeedParserDict: feedparser の解析結果
+    """
+    log_debug("Fetching feed", feed_name=feed['name'], feed_url=feed['url'])
+    result = feedparser.iterparse(feed['url'],
+                                  etag=feed_state.get('etag'),
+                                  modified=feed_state.get('modified'),
+                                  handlers=[_TimeoutHandler(feed.get('timeout', FEED_TIMEOUT))],
+                                  profile=feed.get('profile', PARSE_PROFILE),
+                                  compact_entries=True)
+    if feed.get('ordered'):
+        result['entries'] = take_until(result['entries'], cutoff)
+    else:
+        result['entries'] = list(result['entries'])
+    return result
+
+
+def fetch_feeds(feeds, state_store, cutoff):
+    """
+    複数のフィードを並列に取得する関数
+
+    Args:
+        feeds (list): フィード定義のリスト
+        state_store (StateStore): 状態ストア
+        cutoff (datetime): 公開日時の下限
+
+    Returns:
+        list: 取得できたフィードの (フィード定義, 解析結果) のリスト（フィード一覧の順）
+    """
+    if not feeds:
+        return []
+
+    feed_states = {feed['url']: state_store.get(feed['url']) or {} for feed in feeds}
+
+    executor = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(feeds)))
+    futures = [(executor.submit(fetch_feed, feed, feed_states[feed['url']], cutoff), feed) for feed in feeds]
+    done, _ = wait([future for future, _ in futures], timeout=FETCH_DEADLINE)
+    # 期限内に終わらなかったフィードは待たない
+    executor.shutdown(wait=False)
+
+    results = []
+    for future, feed in futures:
+        if future not in done:
+            log_error("Timed out fetching feed", feed_name=feed['name'], feed_url=feed['url'])
+            continue
+        try:
+            results.append((feed, future.result()))
+        except Exception as e:
+            log_error("Error fetching feed", feed_name=feed['name'], feed_url=feed['url'], error=str(e))
+    return results
+
+
+def merge_entries(results):
+    """
+    複数フィードのエントリを正規化リンクで重複排除して結合する関数
+
+    Args:
+        results (list): (フィード定義, 解析結果) のリスト
+
+    Returns:
+        list: 重複を除いたエントリのリスト
+    """
+    merged = []
+    links = set()
+    for feed, result in results:
+        for entry in result.entries:
+            link = entry.get('link')
+            if link:
+                key = canonical_link(link)
+                if key in links:
+                    continue
+                links.add(key)
+            merged.append(entry)
+    return merged
@@ -1,29 +1,73 @@
 import json
+import os
 import boto3
-import feedparser
 from datetime import datetime, timezone, timedelta
 
-# AWSのニュースフィードのURL
-AWS_RSS_URL = "https://aws.amazon.com/about-aws/whats-new/recent/feed/"
+from article_index import SeenArticleIndex
+from common import log_info
+from feeds import fetch_feeds, get_enabled_feeds, merge_entries
+from state_store import get_state_store
+
+# process_article に1回の呼び出しで渡す記事数
+ARTICLE_BATCH_SIZE = int(os.environ.get('ARTICLE_BATCH_SIZE', '8'))
 
 def handler(event, context):
     news_items = get_aws_news()
-    
+
+    # ステートマシンは batches だけを使う（記事の一覧を重ねて返すと状態の大きさの上限に近づく）
     return {
-        "articles": news_items
+        "batches": batch_articles(news_items, ARTICLE_BATCH_SIZE)
     }
 
-def get_aws_news():
+def batch_articles(news_items, batch_size):
+    """
+    記事を process_article のバッチ入力に分割する関数
+
+    Args:
+        news_items (list): 記事のリスト
+        batch_size (int): 1バッチあたりの記事数
+
+    Returns:
+        list: {"articles": [...]} 形式のバッチのリスト
+    """
+    return [
+        {"articles": news_items[i:i + batch_size]}
+        for i in range(0, len(news_items), batch_size)
+    ]
+
+def get_aws_news(state_store=None, feeds=None):
+    if state_store is None:
+        state_store = get_state_store()
+    if feeds is None:
+        feeds = get_enabled_feeds()
+
     current_date = datetime.now(timezone.utc)
+    # 5日間のウィンドウは安全のための下限としてのみ使い、実際の対象は未処理の記事に絞る
     five_days_ago = current_date - timedelta(days=5)
-    feed = feedparser.parse(AWS_RSS_URL)
+    seen_index = SeenArticleIndex.load(state_store)
+    cutoff = seen_index.cutoff(five_days_ago)
 
-    news_items = []
-    for entry in feed.entries:
+    # 前回の ETag/Last-Modified を使って全フィードを並列に取得する
+    results = fetch_feeds(feeds, state_store, cutoff)
+    all_succeeded = len(results) == len(feeds)
+    fetched = []
+    for feed, result in results:
+        # 304 Not Modified の場合はフィードに変更がないので対象外
+        if result.get('status') == 304:
+            log_info("Feed not modified since last fetch", feed_name=feed['name'])
+            continue
+        # 取得に失敗したフィードは状態を更新しない
+        if result.get('status', 500) >= 400:
+            log_info("Feed fetch failed", feed_name=feed['name'], status=result.get('status'))
+            all_succeeded = False
+            continue
+        fetched.append((feed, result))
+
+    for entry in merge_entries(fetched):
         try:
             published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-            if published >= five_days_ago:
-                news_items.append({
+            if published >= cutoff and not seen_index.is_seen(entry):
+                seen_index.add_pending(entry, {
                     "title": entry.title,
                     "link": entry.link,
                     "published": published.isoformat()
@@ -32,4 +76,22 @@ def get_aws_news():
             # published_parsed が存在しないか、不正な形式の場合はスキップ
             continue
 
-    return news_items
\ No newline at end of file
+    # 次回の条件付きリクエスト用の値を保存
+    for feed, result in fetched:
+        if result.get('etag') or result.get('modified'):
+            state_store.put(feed['url'], {
+                'etag': result.get('etag'),
+                'modified': result.get('modified')
+            })
+
+    # 渡す記事は処理待ちとして記録し、record_processed が成功を記録するまで毎回渡し直す
+    # （フィードが 304 を返しても、前回失敗した記事は渡す）。
+    # ウォーターマークは全フィードの取得に成功した場合のみ進める
+    seen_index.prune(cutoff, five_days_ago)
+    if fetched and all_succeeded:
+        seen_index.watermark = current_date
+    seen_index.save(state_store)
+    news_items = seen_index.pending_articles()
+    log_info("Emitting new articles", article_count=len(news_items), cutoff=cutoff.isoformat())
+
+    return news_items
@@ -0,0 +1,57 @@
+import json
+import logging
+
+from article_index import SeenArticleIndex
+from common import log_info
+from state_store import get_state_store
+
+def handler(event, context):
+    """
+    process_article の処理結果を受け取り、Notion に追加された（またはキューに入った）記事を既出として記録する関数
+
+    失敗した記事は処理待ちのまま残し、次回の fetch_news で再び渡す。
+
+    Args:
+        event (dict): ProcessArticlesMap の結果を processedArticles に持つイベント
+        context: Lambda のコンテキスト
+
+    Returns:
+        dict: 既出として記録した記事数と、処理待ちのまま残っている記事数
+    """
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    state_store = get_state_store()
+    seen_index = SeenArticleIndex.load(state_store)
+
+    confirmed_count = 0
+    for batch in event.get('processedArticles') or []:
+        results = (batch.get('result') or {}).get('results') or []
+        for article, result in zip(batch['articles'], results):
+            if is_published(result) and seen_index.confirm(article['link']):
+                confirmed_count += 1
+    seen_index.save(state_store)
+
+    log_info("Recorded processed articles", confirmed_count=confirmed_count,
+             pending_count=len(seen_index.pending))
+    return {
+        'confirmedCount': confirmed_count,
+        'pendingCount': len(seen_index.pending)
+    }
+
+def is_published(result):
+    """
+    process_article の結果が、記事を Notion に追加した（またはキューに入れた）ものかどうかを返す関数
+
+    Args:
+        result (dict): statusCode と JSON 文字列の body を持つ処理結果
+
+    Returns:
+        bool: 追加した、追加済みだった、またはキューに入れた場合はTrue
+    """
+    if result.get('statusCode') != 200:
+        return False
+    try:
+        body = json.loads(result['body'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return bool(body.get('addedToNotion') or body.get('queuedForNotion'))
@@ -66,6 +66,15 @@ class SGMLParser(_markupbase.ParserBase):
         """Reset this instance. Loses all unprocessed data."""
         self.__starttag_text = None
         self.rawdata = ''
+        # Unprocessed input is rawdata[rawpos:] followed by rawchunks.  New
+        # data is only appended to rawchunks; the buffer is compacted once,
+        # at the start of the next scan, instead of after every feed().
+        self.rawpos = 0
+        self.rawchunks = []
+        # Number of characters fed since the last scan, and the number
+        # required before scanning again (see feed()).
+        self.rawfed = 0
+        self.rawwait = 0
         self.stack = []
         self.lasttag = '???'
         self.nomoretags = 0
@@ -92,10 +101,18 @@ class SGMLParser(_markupbase.ParserBase):
         Call this as often as you want, with as little or as much text
         as you want (may include '\n').  (This just saves the text,
         all the processing is done by goahead().)
+
+        If the previous scan stopped at an incomplete construct (e.g. an
+        unterminated comment), the buffer is not scanned again until at
+        least as much new data as was left over has arrived.  Otherwise a
+        long pending construct would be re-copied and re-scanned on every
+        call, which is quadratic in the input size.
         """
 
-        self.rawdata = self.rawdata + data
-        self.goahead(0)
+        self.rawchunks.append(data)
+        self.rawfed += len(data)
+        if self.rawfed >= self.rawwait:
+            self.goahead(0)
 
     def close(self):
         """Handle the remaining data."""
@@ -108,6 +125,11 @@ class SGMLParser(_markupbase.ParserBase):
     # and data to be processed by a subsequent call.  If 'end' is
     # true, force handling all data as if followed by EOF marker.
     def goahead(self, end):
+        if self.rawpos or self.rawchunks:
+            self.rawdata = self.rawdata[self.rawpos:] + ''.join(self.rawchunks)
+            self.rawpos = 0
+            self.rawchunks = []
+        self.rawfed = 0
         rawdata = self.rawdata
         i = 0
         n = len(rawdata)
@@ -206,7 +228,13 @@ class SGMLParser(_markupbase.ParserBase):
         if end and i < n:
             self.handle_data(rawdata[i:n])
             i = n
-        self.rawdata = rawdata[i:]
+        # Keep scanning offsets instead of slicing off the processed input;
+        # the next goahead() drops it together with appending new data.
+        if end:
+            self.rawdata = ''
+            i = n = 0
+        self.rawpos = i
+        self.rawwait = n - i
         # XXX if end: check for empty stack
 
     # Extensions for the DOCTYPE scanner:
@@ -0,0 +1,118 @@
+import json
+import os
+import boto3
+from botocore.exceptions import ClientError
+from common import log_debug, log_error
+
+# ローカルファイルバックエンドのデフォルトパス（Lambda のウォームコンテナ間で共有される）
+DEFAULT_STATE_PATH = "/tmp/fetch_news_state.json"
+
+
+class StateStore:
+    """
+    fetch_news の状態（ETag/Last-Modified など）を保存するストアの基底クラス
+
+    値は JSON にシリアライズ可能な dict とする。
+    """
+
+    def get(self, key):
+        """
+        状態を取得する
+
+        Args:
+            key (str): 状態のキー
+
+        Returns:
+            dict: 保存されている状態、存在しない場合はNone
+        """
+        raise NotImplementedError
+
+    def put(self, key, value):
+        """
+        状態を保存する
+
+        Args:
+            key (str): 状態のキー
+            value (dict): 保存する状態
+        """
+        raise NotImplementedError
+
+
+class DynamoDBStateStore(StateStore):
+    """
+    DynamoDBテーブルに状態を保存するストア
+
+    テーブルは文字列のパーティションキー `state_key` を持ち、状態は JSON 文字列として
+    `state` 属性に保存する。
+    """
+
+    def __init__(self, table_name):
+        self.table = boto3.resource('dynamodb').Table(table_name)
+
+    def get(self, key):
+        try:
+            response = self.table.get_item(Key={'state_key': key})
+        except ClientError as e:
+            log_error("Error retrieving feed state", state_key=key, error=str(e))
+            raise
+        item = response.get('Item')
+        if not item:
+            return None
+        return json.loads(item['state'])
+
+    def put(self, key, value):
+        try:
+            self.table.put_item(Item={
+                'state_key': key,
+                'state': json.dumps(value, ensure_ascii=False)
+            })
+        except ClientError as e:
+            log_error("Error saving feed state", state_key=key, error=str(e))
+            raise
+
+
+class LocalFileStateStore(StateStore):
+    """
+    ローカルの JSON ファイルに状態を保存するストア（テストやローカル実行用）
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # 壊れたファイルは空の状態として扱う
+            log_debug("Invalid state file, ignoring", path=self.path)
+            return {}
+
+    def get(self, key):
+        return self._load().get(key)
+
+    def put(self, key, value):
+        states = self._load()
+        states[key] = value
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(states, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def get_state_store():
+    """
+    環境変数に応じた状態ストアを返す関数
+
+    `FEED_STATE_TABLE_NAME` が設定されていれば DynamoDB を、そうでなければ
+    `FEED_STATE_PATH`（未設定時は /tmp）のローカルファイルを使用する。
+
+    Returns:
+        StateStore: 状態ストア
+    """
+    table_name = os.environ.get('FEED_STATE_TABLE_NAME')
+    if table_name:
+        return DynamoDBStateStore(table_name)
+    return LocalFileStateStore(os.environ.get('FEED_STATE_PATH', DEFAULT_STATE_PATH))
@@ -1,47 +1,105 @@
 import json
+import os
+import threading
 import traceback
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
-from openai import OpenAI
+from openai import AuthenticationError, OpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
-from common import log_debug, log_info, log_error, get_parameter
+from common import log_debug, log_info, log_error, get_parameter, invalidate_parameters
+from http_client import get_session
+from aws_services import get_abbreviations
+from service_tagger import get_service_tagger
+from content_cache import content_cache_key, get_content_cache
+
+# 使用する OpenAI のモデル
+OPENAI_MODEL = "gpt-4o"
+
+# 翻訳・要約のプロンプトのバージョン（プロンプトや後処理を変えたら上げて、キャッシュを無効にする）
+TRANSLATION_PROMPT_VERSION = 2
+SUMMARY_PROMPT_VERSION = 1
+COMBINED_PROMPT_VERSION = 1
+
+# 翻訳を分割する1チャンクの最大文字数と、チャンクを並列に翻訳する数の上限
+TRANSLATION_CHUNK_LENGTH = 3000
+TRANSLATION_MAX_WORKERS = 4
+
+# コンテナ全体で同時に実行する OpenAI API の呼び出し数の上限（バッチ・記事・翻訳チャンクの並列をまとめて制限する）
+OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', '4'))
+
+# タグ・翻訳・要約を1回の LLM 呼び出しでまとめて生成するかどうか
+COMBINED_LLM_CALL = os.environ.get('COMBINED_LLM_CALL', 'false').lower() == 'true'
+
+# 記事の取得に使う HTTP セッション（ホストごとの接続プールをウォームスタート間で使い回す）
+session = get_session()
+
+# 翻訳・要約の結果のキャッシュ（元の本文、モデル、プロンプトのバージョンをキーにする）
+content_cache = get_content_cache()
+
+# ウォームスタート間で使い回す OpenAI クライアントと、その作成に使った API キー
+_openai_client = None
+_openai_client_key = None
+_openai_client_lock = threading.Lock()
+
+# OpenAI API の同時呼び出し数を制限するセマフォ（リトライの待機中は解放する）
+_openai_semaphore = threading.BoundedSemaphore(OPENAI_MAX_CONCURRENCY)
 
 def initialize_openai_client(openai_api_key_param):
     """
     OpenAI クライアントを初期化する関数
 
+    API キーが変わらない限り作成済みのクライアントを返し、HTTP 接続プールを使い回す。
+
     Args:
         openai_api_key_param (str): OpenAI API キーを格納するパラメータ名
 
     Returns:
         OpenAI: 初期化された OpenAI クライアントインスタンス
     """
+    global _openai_client, _openai_client_key
     openai_api_key = get_parameter(openai_api_key_param)
-    return OpenAI(api_key=openai_api_key)
+    with _openai_client_lock:
+        if _openai_client is None or _openai_client_key != openai_api_key:
+            _openai_client = OpenAI(api_key=openai_api_key)
+            _openai_client_key = openai_api_key
+        return _openai_client
 
 @retry(stop=stop_after_attempt(3),
        wait=wait_exponential(multiplier=1, min=4, max=10))
-def call_openai_api(messages, openai_api_key_param):
+def call_openai_api(messages, openai_api_key_param, **options):
     """
     OpenAI APIを呼び出す関数（リトライ機能付き）
 
+    同時に実行される呼び出しはコンテナ全体で OPENAI_MAX_CONCURRENCY 件までに制限する。
+
     Args:
         messages (list): APIに送信するメッセージのリスト
         openai_api_key_param (str): OpenAI API キーを格納するパラメータ名
+        **options: chat.completions.create に渡す追加の引数（response_format など）
 
     Returns:
         dict: OpenAI APIのレスポンス
     """
     client = initialize_openai_client(openai_api_key_param)
-    return client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages
-    )
+    try:
+        with _openai_semaphore:
+            return client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                **options
+            )
+    except AuthenticationError:
+        # API キーが更新された可能性があるため、次の試行では Parameter Store から読み直す
+        invalidate_parameters(openai_api_key_param)
+        raise
 
 def tag_article(article_title, article_content, service_list, service_dict, openai_api_key_param):
     """
     記事のタイトルと本文に基づいてAWSサービスのタグを1つ付ける関数（改善版）
 
+    タイトルや本文のサービス名から一意に決まる場合は LLM を呼ばずにタグを返し、
+    出現がない場合や候補が並んだ場合だけ、絞り込んだ候補を LLM に問い合わせる。
+
     Args:
         article_title (str): 記事のタイトル
         article_content (str): 記事の本文
@@ -57,8 +115,17 @@ def tag_article(article_title, article_content, service_list, service_dict, open
               content_length=len(article_content),
               service_dict_length=len(service_dict))
 
-    # service_dict から略称のリストを作成
-    abbreviations = list(set(service_dict.values()))
+    # タイトルや本文にサービス名がそのまま出現する場合は LLM を呼ばずにタグを決める
+    tagger = get_service_tagger(service_dict)
+    local_tag = tagger.tag(article_title, article_content)
+    if local_tag:
+        log_debug("Valid tag found (local match)", valid_tag=local_tag)
+        return [local_tag]
+
+    # プロンプトには関連しそうな候補だけを渡し、LLM の回答もその候補の中から検証する
+    # 候補が見つからない場合だけ全略称のリストを使う（キャッシュ済みの一覧は事前に計算してある）
+    abbreviations = tagger.candidates(article_title, article_content) or get_abbreviations(service_dict)
+    log_debug("Candidate tags selected", candidate_count=len(abbreviations))
 
     candidate_tags_prompt = f"""You are an AI assistant specialized in identifying the most relevant AWS service mentioned in technical articles. 
     Your task is to analyze the given article title and content, and identify the single most relevant AWS service.
@@ -76,7 +143,7 @@ def tag_article(article_title, article_content, service_list, service_dict, open
 
     Article content (excerpt): {article_content[:2000]}  # 最初の2000文字を使用
 
-    List of AWS service abbreviations (use exact abbreviations as provided):
+    List of candidate AWS service abbreviations (use exact abbreviations as provided):
     {', '.join(abbreviations)}
 
     Your response should be the single most relevant AWS service abbreviation, exactly as it appears in the list above:"""
@@ -94,21 +161,9 @@ def tag_article(article_title, article_content, service_list, service_dict, open
         candidate_tag = candidate_tag_response.choices[0].message.content.strip()
         log_debug("Received candidate tag from OpenAI", candidate_tag=candidate_tag)
         
-        # 厳格なマッチング（完全一致）
-        if candidate_tag in abbreviations:
-            log_debug("Valid tag found (strict match)", valid_tag=candidate_tag)
-            return [candidate_tag]
-        
-        # 緩和されたマッチング
-        relaxed_match = None
-        for abbr in abbreviations:
-            if candidate_tag.lower() == abbr.lower():
-                relaxed_match = abbr
-                break
-        
-        if relaxed_match:
-            log_debug("Valid tag found (relaxed match)", valid_tag=relaxed_match, original_suggestion=candidate_tag)
-            return [relaxed_match]
+        valid_tag = match_abbreviation(candidate_tag, abbreviations)
+        if valid_tag:
+            return [valid_tag]
         
         log_debug("No valid tag found", article_title=article_title, suggested_tag=candidate_tag)
         return []
@@ -121,10 +176,104 @@ def tag_article(article_title, article_content, service_list, service_dict, open
                   article_title=article_title)
         return []
 
+def match_abbreviation(candidate_tag, abbreviations):
+    """
+    LLM が提案したタグを略称のリストと照合する関数
+
+    Args:
+        candidate_tag (str): LLM が提案したタグ
+        abbreviations (list): 有効な略称のリスト
+
+    Returns:
+        str: 一致した略称、一致しない場合はNone
+    """
+    # 厳格なマッチング（完全一致）
+    if candidate_tag in abbreviations:
+        log_debug("Valid tag found (strict match)", valid_tag=candidate_tag)
+        return candidate_tag
+
+    # 緩和されたマッチング
+    for abbr in abbreviations:
+        if candidate_tag.lower() == abbr.lower():
+            log_debug("Valid tag found (relaxed match)", valid_tag=abbr, original_suggestion=candidate_tag)
+            return abbr
+    return None
+
+def format_summary(lines):
+    """
+    要約の各行を箇条書きの形式に揃える関数
+
+    Args:
+        lines (list): 要約の行のリスト
+
+    Returns:
+        str: "- " で始まる行を改行でつないだ要約
+    """
+    return '\n'.join([
+        f"- {line.lstrip('•- ').strip()}"
+        for line in lines if line.strip()
+    ])
+
+def split_paragraphs(text, max_length=TRANSLATION_CHUNK_LENGTH):
+    """
+    テキストを段落の境界（空行）で、それぞれ最大長以下のチャンクにまとめる関数
+
+    1つの段落が最大長を超える場合は、その段落だけで1つのチャンクにする。
+
+    Args:
+        text (str): 分割するテキスト
+        max_length (int): 1チャンクの最大文字数
+
+    Returns:
+        list: チャンクのリスト（元の順序）
+    """
+    chunks = []
+    current = []
+    current_length = 0
+    for paragraph in text.split('\n\n'):
+        added_length = len(paragraph) + (2 if current else 0)
+        if current and current_length + added_length > max_length:
+            chunks.append('\n\n'.join(current))
+            current = []
+            current_length = 0
+            added_length = len(paragraph)
+        current.append(paragraph)
+        current_length += added_length
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+def translate_chunk(text, openai_api_key_param):
+    """
+    1チャンクのテキストを英語から日本語に翻訳する関数
+
+    Args:
+        text (str): 翻訳する英語のテキスト
+        openai_api_key_param (str): OpenAI API キーを格納するパラメータ名
+
+    Returns:
+        str: 翻訳された日本語のテキスト
+    """
+    response = call_openai_api([
+        {"role": "system", "content": "You are a helpful assistant that "
+                                      "translates English to Japanese. "
+                                      "Respond with the translation only."},
+        {"role": "user", "content": f"Translate the following English "
+                                    f"text to Japanese:\n\n{text}"}
+    ], openai_api_key_param)
+    translated_text = response.choices[0].message.content.strip()
+    translated_lines = translated_text.split('\n')
+    # 「以下は翻訳です：」のような前置きの行だけを取り除く
+    if len(translated_lines) > 1 and translated_lines[0].rstrip().endswith((':', '：')):
+        translated_lines = translated_lines[1:]
+    return '\n'.join(translated_lines).strip()
+
 def translate_text(text, openai_api_key_param):
     """
     テキストを英語から日本語に翻訳する関数
 
+    長いテキストは段落の境界でチャンクに分け、並列に翻訳してから元の順序でつなぎ直す。
+
     Args:
         text (str): 翻訳する英語のテキスト
         openai_api_key_param (str): OpenAI API キーを格納するパラメータ名
@@ -132,22 +281,26 @@ def translate_text(text, openai_api_key_param):
     Returns:
         str: 翻訳された日本語のテキスト
     """
+    cache_key = content_cache_key('translation', text, OPENAI_MODEL, TRANSLATION_PROMPT_VERSION)
+    cached = content_cache.get(cache_key)
+    if cached is not None:
+        log_debug("Translation cache hit", cache_key=cache_key)
+        return cached['text']
+
     try:
-        log_debug("Translating text", text_length=len(text))
-        response = call_openai_api([
-            {"role": "system", "content": "You are a helpful assistant that "
-                                          "translates English to Japanese."},
-            {"role": "user", "content": f"Translate the following English "
-                                        f"text to Japanese:\n\n{text}"}
-        ], openai_api_key_param)
-        translated_text = response.choices[0].message.content.strip()
-        translated_lines = translated_text.split('\n')
-        result = '\n'.join(translated_lines[1:]
-                           if len(translated_lines) > 1
-                           else translated_lines)
+        chunks = split_paragraphs(text)
+        log_debug("Translating text", text_length=len(text), chunk_count=len(chunks))
+        if len(chunks) == 1:
+            translated_chunks = [translate_chunk(chunks[0], openai_api_key_param)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(TRANSLATION_MAX_WORKERS, len(chunks))) as executor:
+                translated_chunks = list(executor.map(
+                    lambda chunk: translate_chunk(chunk, openai_api_key_param), chunks))
+        result = '\n\n'.join(translated_chunks)
         log_debug("Text translated successfully",
                   original_length=len(text),
                   translated_length=len(result))
+        content_cache.put(cache_key, {'text': result})
         return result
     except Exception as e:
         log_debug("Error translating text",
@@ -156,53 +309,145 @@ def translate_text(text, openai_api_key_param):
 
 def generate_summary(text, openai_api_key_param):
     """
-    日本語テキストの要約を生成する関数
+    英語テキストの要約を日本語で生成する関数
+
+    翻訳を待たずに実行できるよう、翻訳前の原文から直接要約する。
 
     Args:
-        text (str): 要約する日本語のテキスト
+        text (str): 要約する英語のテキスト
         openai_api_key_param (str): OpenAI API キーを格納するパラメータ名
 
     Returns:
         str: 生成された要約
     """
+    cache_key = content_cache_key('summary', text, OPENAI_MODEL, SUMMARY_PROMPT_VERSION)
+    cached = content_cache.get(cache_key)
+    if cached is not None:
+        log_debug("Summary cache hit", cache_key=cache_key)
+        return cached['text']
+
     try:
         log_debug("Generating summary", text_length=len(text))
         response = call_openai_api([
             {"role": "system", "content": "You are a helpful assistant that "
-                                          "summarizes Japanese text in the "
-                                          "most important 3 bullet points."},
-            {"role": "user", "content": f"以下の日本語テキストの最も重要な3つの"
-                                        f"ポイントを箇条書きで簡潔に要約してくだ"
-                                        f"さい：\n\n{text}"}
+                                          "summarizes English text in Japanese "
+                                          "in the most important 3 bullet points."},
+            {"role": "user", "content": f"以下の英語テキストの最も重要な3つの"
+                                        f"ポイントを日本語の箇条書きで簡潔に要約"
+                                        f"してください：\n\n{text}"}
         ], openai_api_key_param)
         summary = response.choices[0].message.content.strip()
-        summary_lines = summary.split('\n')
-        formatted_summary = '\n'.join([
-            f"- {line.lstrip('•- ').strip()}"
-            for line in summary_lines if line.strip()
-        ])
+        formatted_summary = format_summary(summary.split('\n'))
         log_debug("Summary generated successfully",
                   summary_length=len(formatted_summary))
+        content_cache.put(cache_key, {'text': formatted_summary})
         return formatted_summary
     except Exception as e:
         log_debug("Error generating summary",
                   error=str(e), error_type=type(e).__name__)
         return "要約を生成できませんでした。エラー: " + str(e)
 
-def scrape_and_translate_article_content(url, openai_api_key_param):
+def process_content_combined(article_title, content, service_dict, openai_api_key_param):
     """
-    記事のコンテンツをスクレイピングし、翻訳と要約を行う関数
+    タグ・翻訳・要約を1回の LLM 呼び出しでまとめて生成する関数
+
+    応答は JSON で受け取り、タグは候補の略称と、要約は通常の要約と同じ形式で検証する。
 
     Args:
-        url (str): 記事のURL
+        article_title (str): 記事のタイトル
+        content (str): 記事の本文
+        service_dict (dict): サービス名とその略称の辞書
         openai_api_key_param (str): OpenAI API キーを格納するパラメータ名
 
     Returns:
-        dict: スクレイピング、翻訳、要約された記事の内容
+        dict: tags、translated_content、summary を持つ辞書。応答を解釈できなかった場合はNone
+    """
+    tagger = get_service_tagger(service_dict)
+    local_tag = tagger.tag(article_title, content[:2000])
+
+    cache_key = content_cache_key('combined', content, OPENAI_MODEL, COMBINED_PROMPT_VERSION)
+    cached = content_cache.get(cache_key)
+    if cached is not None:
+        log_debug("Combined result cache hit", cache_key=cache_key)
+        tags = [local_tag] if local_tag else tag_article(article_title, content[:2000], [], service_dict, openai_api_key_param)
+        return {
+            'tags': tags,
+            'translated_content': cached['translated_content'],
+            'summary': cached['summary']
+        }
+
+    abbreviations = tagger.candidates(article_title, content[:2000]) or get_abbreviations(service_dict)
+    prompt = f"""Analyze the following AWS article and respond with a JSON object that has exactly these keys:
+    - "tag": the single most relevant AWS service abbreviation, exactly as written in the candidate list below, or null if none is relevant.
+    - "translated_content": the full article text translated from English to Japanese, keeping the paragraph breaks.
+    - "summary_bullets": an array of the 3 most important points of the article, each a concise Japanese sentence.
+
+    Candidate AWS service abbreviations: {', '.join(abbreviations)}
+
+    Article title: {article_title}
+
+    Article text:
+    {content}"""
+
+    try:
+        log_debug("Processing content with a combined call", content_length=len(content), candidate_count=len(abbreviations))
+        response = call_openai_api([
+            {"role": "system", "content": "You are a helpful assistant that tags, translates and summarizes "
+                                          "AWS articles. Respond only with a JSON object."},
+            {"role": "user", "content": prompt}
+        ], openai_api_key_param, response_format={"type": "json_object"})
+        # 出力の上限で途中まで切れた応答は、JSON として解釈できても翻訳が欠けているため使わない
+        finish_reason = response.choices[0].finish_reason
+        if finish_reason != 'stop':
+            raise ValueError(f"response did not finish normally: {finish_reason}")
+        data = json.loads(response.choices[0].message.content)
+
+        translated_content = data['translated_content']
+        summary_bullets = data['summary_bullets']
+        tag = data.get('tag')
+        if not isinstance(translated_content, str) or not translated_content.strip():
+            raise ValueError("translated_content is empty")
+        if not isinstance(summary_bullets, list) or not all(isinstance(line, str) for line in summary_bullets):
+            raise ValueError("summary_bullets is not a list of strings")
+        summary = format_summary(summary_bullets)
+        if not summary:
+            raise ValueError("summary_bullets is empty")
+        if tag is not None and not isinstance(tag, str):
+            raise ValueError("tag is not a string")
+    except Exception as e:
+        log_debug("Error in combined call, falling back to separate calls",
+                  error=str(e), error_type=type(e).__name__)
+        return None
+
+    if local_tag:
+        tags = [local_tag]
+    else:
+        valid_tag = match_abbreviation(tag, abbreviations) if tag else None
+        tags = [valid_tag] if valid_tag else []
+
+    translated_content = translated_content.strip()
+    content_cache.put(cache_key, {'translated_content': translated_content, 'summary': summary})
+    log_debug("Combined call completed", tags=tags, translated_length=len(translated_content),
+              summary_length=len(summary))
+    return {
+        'tags': tags,
+        'translated_content': translated_content,
+        'summary': summary
+    }
+
+def scrape_article_content(url):
+    """
+    記事のコンテンツをスクレイピングする関数
+
+    Args:
+        url (str): 記事のURL
+
+    Returns:
+        dict: 記事の本文とリンク。本文を取得できなかった場合は error に表示用のメッセージを含む
     """
     try:
         log_debug("Scraping article content", url=url)
-        response = requests.get(url)
+        response = session.get(url)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -211,44 +456,33 @@ def scrape_and_translate_article_content(url, openai_api_key_param):
             paragraphs = content_div.find_all('p')
             content = '\n\n'.join([p.get_text() for p in paragraphs])
 
-            log_debug("Article content scraped", content_length=len(content))
-
-            original_content = content
-            translated_content = translate_text(content, openai_api_key_param)
-            summary = generate_summary(translated_content, openai_api_key_param)
-
             urls = [
                 a['href'] for a in content_div.find_all('a', href=True)
                 if a['href'].startswith('http')
             ]
 
-            log_debug("Article content processed",
+            log_debug("Article content scraped",
                       url=url,
                       content_length=len(content),
-                      translated_length=len(translated_content),
-                      summary_length=len(summary),
                       url_count=len(urls))
             return {
-                "summary": summary,
-                "translated_content": translated_content,
-                "original_content": original_content,
-                "urls": urls
+                "original_content": content,
+                "urls": urls,
+                "error": None
             }
         else:
             log_debug("Could not find content div", url=url)
             return {
-                "summary": "記事の本文を抽出できませんでした。",
-                "translated_content": "記事の本文を抽出できませんでした。",
                 "original_content": "",
-                "urls": []
+                "urls": [],
+                "error": "記事の本文を抽出できませんでした。"
             }
     except Exception as e:
         log_debug("Error scraping article content", error=str(e), url=url)
         return {
-            "summary": "記事の本文を取得できませんでした。",
-            "translated_content": "記事の本文を取得できませんでした。",
             "original_content": "",
-            "urls": []
+            "urls": [],
+            "error": "記事の本文を取得できませんでした。"
         }
 
 def process_article(event, service_list, service_dict, openai_api_key_param):
@@ -267,20 +501,42 @@ def process_article(event, service_list, service_dict, openai_api_key_param):
     try:
         log_debug("Processing article", article_title=event['title'])
         
-        article_content = scrape_and_translate_article_content(event['link'], openai_api_key_param)
-        log_debug("Article content scraped and translated", article_title=event['title'], content_length=len(article_content['original_content']))
-        
-        log_debug("Starting tag_article", article_title=event['title'])
-        tags = tag_article(event['title'], article_content['original_content'][:2000], service_list, service_dict, openai_api_key_param)
+        article_content = scrape_article_content(event['link'])
+        original_content = article_content['original_content']
+        log_debug("Article content scraped", article_title=event['title'], content_length=len(original_content))
+
+        # 1回の応答に全文の翻訳が収まらないおそれがある長い記事は、分割して翻訳する個別の呼び出しで処理する
+        combined = None
+        if (COMBINED_LLM_CALL and article_content['error'] is None
+                and len(original_content) <= TRANSLATION_CHUNK_LENGTH):
+            combined = process_content_combined(event['title'], original_content, service_dict, openai_api_key_param)
+
+        if combined is not None:
+            tags = combined['tags']
+            translated_content = combined['translated_content']
+            summary = combined['summary']
+        else:
+            # タグ付け・翻訳・要約はいずれも原文だけに依存するため並列に実行する
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                log_debug("Starting tag_article", article_title=event['title'])
+                tag_future = executor.submit(tag_article, event['title'], original_content[:2000], service_list, service_dict, openai_api_key_param)
+                if article_content['error'] is None:
+                    translate_future = executor.submit(translate_text, original_content, openai_api_key_param)
+                    summary_future = executor.submit(generate_summary, original_content, openai_api_key_param)
+                    translated_content = translate_future.result()
+                    summary = summary_future.result()
+                else:
+                    translated_content = summary = article_content['error']
+                tags = tag_future.result()
         log_debug("tag_article completed", article_title=event['title'], tags=tags)
         
         result = {
             'title': event['title'],
             'link': event['link'],
             'tags': tags,
-            'summary': article_content['summary'],
-            'translated_content': article_content['translated_content'],
-            'original_content': article_content['original_content'],
+            'summary': summary,
+            'translated_content': translated_content,
+            'original_content': original_content,
             'urls': article_content['urls']
         }
         
@@ -0,0 +1,142 @@
+import base64
+import json
+import os
+import queue
+import uuid
+import zlib
+import boto3
+from botocore.exceptions import ClientError
+from common import log_debug, log_error
+
+# Notion への追加に必要な処理済み記事のフィールド
+REQUIRED_RECORD_FIELDS = ('title', 'link', 'tags', 'summary', 'urls', 'translated_content', 'original_content')
+
+# 値がなくてもよいフィールド（公開日時がない場合は Notion への追加時に現在時刻を使う）
+OPTIONAL_RECORD_FIELDS = ('published',)
+
+# SQS のメッセージの最大サイズ（バイト）
+SQS_MAX_MESSAGE_SIZE = 256 * 1024
+
+
+def encode_record(processed_article):
+    """
+    処理済みの記事を、Notion への追加に必要なフィールドだけを圧縮したメッセージ本文にする関数
+
+    Args:
+        processed_article (dict): 処理された記事の情報
+
+    Returns:
+        str: メッセージ本文（JSON 文字列）
+
+    Raises:
+        ValueError: 必須のフィールドがない場合（処理に失敗した記事など）
+    """
+    missing = [field for field in REQUIRED_RECORD_FIELDS if field not in processed_article]
+    if missing:
+        raise ValueError(f"Processed article is missing fields: {', '.join(missing)}")
+    record = {field: processed_article[field] for field in REQUIRED_RECORD_FIELDS}
+    record.update({field: processed_article.get(field) for field in OPTIONAL_RECORD_FIELDS})
+    data = zlib.compress(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+    return json.dumps({'encoding': 'zlib', 'data': base64.b64encode(data).decode('ascii')})
+
+
+def decode_record(body):
+    """
+    encode_record で作成したメッセージ本文から記事の情報を取り出す関数
+
+    Args:
+        body (str): メッセージ本文
+
+    Returns:
+        dict: 処理された記事の情報
+    """
+    message = json.loads(body)
+    return json.loads(zlib.decompress(base64.b64decode(message['data'])).decode('utf-8'))
+
+
+class ArticlePublisher:
+    """
+    処理済みの記事を Notion への追加を行う publisher に渡すキューの基底クラス
+    """
+
+    def publish(self, processed_article):
+        """
+        記事をキューに入れる
+
+        Args:
+            processed_article (dict): 処理された記事の情報
+
+        Returns:
+            bool: キューに入れた場合はTrue、メッセージが大きすぎるか送信に失敗した場合はFalse
+                （呼び出し側が直接 Notion に追加する）
+        """
+        raise NotImplementedError
+
+
+class SQSArticlePublisher(ArticlePublisher):
+    """
+    SQS キューに記事を送る publisher（notion_publisher.handler が受信して Notion に追加する）
+    """
+
+    def __init__(self, queue_url):
+        self.queue_url = queue_url
+        self.client = boto3.client('sqs')
+
+    def publish(self, processed_article):
+        body = encode_record(processed_article)
+        if len(body.encode('utf-8')) > SQS_MAX_MESSAGE_SIZE:
+            log_debug("Article record too large for queue", article_link=processed_article['link'],
+                      size=len(body))
+            return False
+        try:
+            self.client.send_message(QueueUrl=self.queue_url, MessageBody=body)
+        except ClientError as e:
+            log_error("Error sending article to publish queue", error=str(e),
+                      article_link=processed_article['link'])
+            return False
+        return True
+
+
+class InMemoryArticlePublisher(ArticlePublisher):
+    """
+    メモリ上のキューに記事を入れる publisher（テストやローカル実行用）
+
+    drain() で取り出したレコードを notion_publisher.handler に SQS のイベントとして渡せる。
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def publish(self, processed_article):
+        self.queue.put({'messageId': str(uuid.uuid4()), 'body': encode_record(processed_article)})
+        return True
+
+    def drain(self):
+        """
+        キューに入っているレコードをすべて取り出す
+
+        Returns:
+            list: SQS のイベントの Records と同じ形式のレコードのリスト
+        """
+        records = []
+        while True:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                return records
+
+
+def get_article_publisher():
+    """
+    環境変数に応じた publisher を返す関数
+
+    `NOTION_PUBLISH_QUEUE_URL` が設定されていれば SQS キューを使い、なければNoneを返す
+    （process_article の中で直接 Notion に追加する）。
+
+    Returns:
+        ArticlePublisher: publisher、直接追加する場合はNone
+    """
+    queue_url = os.environ.get('NOTION_PUBLISH_QUEUE_URL')
+    if queue_url:
+        return SQSArticlePublisher(queue_url)
+    return None
@@ -1,11 +1,25 @@
+import json
+import os
 import boto3
 from botocore.exceptions import ClientError
 from common import log_debug, log_info, log_error
 
+# update_services が書き込むバージョン管理用アイテムのキー
+SERVICES_VERSION_KEY = "__version__"
+
+# ウォームスタートをまたいでサービス一覧を保存するファイル
+SERVICES_CACHE_PATH = "/tmp/aws_services_cache.json"
+
+# メモリ上のサービス一覧のキャッシュ
+_services_cache = None
+
 def get_aws_service_list(table_name):
     """
     DynamoDBテーブルからAWSサービスのリストを取得する関数
 
+    update_services が書き込むバージョン管理用アイテムだけを GetItem で確認し、
+    バージョンが変わっていなければメモリまたは /tmp にキャッシュしたサービス一覧を返す。
+
     Args:
         table_name (str): DynamoDBテーブルの名前
 
@@ -17,23 +31,94 @@ def get_aws_service_list(table_name):
     Raises:
         ClientError: DynamoDBへのアクセス中にエラーが発生した場合
     """
+    global _services_cache
     dynamodb = boto3.resource('dynamodb')
     services_table = dynamodb.Table(table_name)
 
+    try:
+        response = services_table.get_item(Key={'service_name': SERVICES_VERSION_KEY})
+    except ClientError as e:
+        log_error("Error retrieving AWS service list version", error=str(e))
+        raise
+    version = response.get('Item', {}).get('checksum')
+
+    if version is not None:
+        if _services_cache is None or _services_cache['version'] != version:
+            _services_cache = _load_cache_file(version)
+        if _services_cache is not None:
+            log_debug("AWS service list cache hit", version=version)
+            return _services_cache['service_list'], _services_cache['service_dict']
+
     try:
         response = services_table.scan()
         items = response['Items']
-        
+
         # ページネーションの処理
         while 'LastEvaluatedKey' in response:
             response = services_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
             items.extend(response['Items'])
-
-        service_dict = {item['service_name']: item['abbreviation'] for item in items}
-        service_list = list(set(service_dict.keys()).union(set(service_dict.values())))
-        
-        log_debug("AWS service list retrieved", service_count=len(service_list))
-        return service_list, service_dict
     except ClientError as e:
         log_error("Error retrieving AWS service list", error=str(e))
-        raise
\ No newline at end of file
+        raise
+
+    service_dict = {
+        item['service_name']: item['abbreviation']
+        for item in items
+        if item['service_name'] != SERVICES_VERSION_KEY
+    }
+    service_list = list(set(service_dict.keys()).union(set(service_dict.values())))
+    log_debug("AWS service list retrieved", service_count=len(service_list))
+
+    # バージョンが分からない場合は検証できないため、キャッシュしない
+    if version is not None:
+        _services_cache = _build_cache(version, service_list, service_dict)
+        _save_cache_file(_services_cache)
+    return service_list, service_dict
+
+def get_abbreviations(service_dict):
+    """
+    サービスの略称の一覧を返す関数
+
+    キャッシュしたサービス一覧の辞書であれば、事前に計算した一覧を返す。
+
+    Args:
+        service_dict (dict): サービス名とその略称の辞書
+
+    Returns:
+        list: 重複を除いて並べ替えた略称のリスト
+    """
+    if _services_cache is not None and _services_cache['service_dict'] is service_dict:
+        return _services_cache['abbreviations']
+    return sorted(set(service_dict.values()))
+
+def _build_cache(version, service_list, service_dict):
+    return {
+        'version': version,
+        'service_list': service_list,
+        'service_dict': service_dict,
+        'abbreviations': sorted(set(service_dict.values()))
+    }
+
+def _load_cache_file(version):
+    try:
+        with open(SERVICES_CACHE_PATH, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('version') != version:
+        return None
+    log_info("Loaded AWS service list from file cache", version=version)
+    return _build_cache(version, cached['service_list'], cached['service_dict'])
+
+def _save_cache_file(cache):
+    tmp_path = SERVICES_CACHE_PATH + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': cache['version'],
+                'service_list': cache['service_list'],
+                'service_dict': cache['service_dict']
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, SERVICES_CACHE_PATH)
+    except OSError as e:
+        log_debug("Could not write AWS service list cache file", error=str(e))
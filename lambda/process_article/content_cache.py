@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import boto3
+from botocore.exceptions import ClientError
+from common import log_debug, log_error
+
+# /tmp の LRU キャッシュのデフォルトの保存先と最大エントリ数（Lambda のウォームコンテナ間で共有される）
+DEFAULT_CACHE_DIR = "/tmp/content_cache"
+DEFAULT_MAX_ENTRIES = 256
+
+# DynamoDB のエントリを保持する期間（秒）
+DYNAMODB_ENTRY_TTL = 30 * 24 * 60 * 60
+
+
+def content_cache_key(kind, content, model, prompt_version):
+    """
+    翻訳や要約の結果を引くためのキーを返す関数
+
+    元の本文、モデル、プロンプトのバージョンのいずれかが変われば別のキーになる。
+
+    Args:
+        kind (str): 結果の種類（translation、summary など）
+        content (str): 元の本文
+        model (str): 使用するモデル名
+        prompt_version (int): プロンプトのバージョン
+
+    Returns:
+        str: キャッシュのキー
+    """
+    digest = hashlib.sha256(
+        '\0'.join([model, str(prompt_version), content]).encode('utf-8')
+    ).hexdigest()
+    return f"{kind}:{digest}"
+
+
+class ContentCache:
+    """
+    翻訳や要約の結果を保存するキャッシュの基底クラス
+
+    値は JSON にシリアライズ可能な dict とする。キャッシュの障害で記事の処理が失敗しないよう、
+    各バックエンドはエラーを記録するだけで例外を送出しない。
+    """
+
+    def get(self, key):
+        """
+        結果を取得する
+
+        Args:
+            key (str): キャッシュのキー
+
+        Returns:
+            dict: 保存されている結果、存在しない場合はNone
+        """
+        raise NotImplementedError
+
+    def put(self, key, value):
+        """
+        結果を保存する
+
+        Args:
+            key (str): キャッシュのキー
+            value (dict): 保存する結果
+        """
+        raise NotImplementedError
+
+
+class LocalDirectoryContentCache(ContentCache):
+    """
+    ローカルのディレクトリに1エントリ1ファイルで結果を保存するキャッシュ（テストやローカル実行用）
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key.replace(':', '-') + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log_debug("Invalid content cache file, ignoring", cache_key=key, error=str(e))
+            return None
+
+    def put(self, key, value):
+        # 同じキーを複数のスレッドが同時に書き込んでも衝突しないよう、書き込みごとに別の一時ファイルを使う
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.directory, suffix='.tmp',
+                                             delete=False) as f:
+                tmp_path = f.name
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            log_error("Error saving content cache entry", cache_key=key, error=str(e))
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+class LRUContentCache(LocalDirectoryContentCache):
+    """
+    /tmp に保存し、最大エントリ数を超えたら最も長く使われていないものから削除するキャッシュ
+
+    参照した時刻はファイルの更新時刻で管理する。
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(directory)
+        self.max_entries = max_entries
+
+    def get(self, key):
+        value = super().get(key)
+        if value is not None:
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+        return value
+
+    def put(self, key, value):
+        super().put(key, value)
+        self._evict()
+
+    def _evict(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.max_entries]:
+                os.remove(entry.path)
+        except OSError as e:
+            log_debug("Error evicting content cache entries", error=str(e))
+
+
+class DynamoDBContentCache(ContentCache):
+    """
+    DynamoDBテーブルに結果を保存するキャッシュ（コンテナや実行をまたいで共有される）
+
+    テーブルは文字列のパーティションキー `cache_key` を持ち、結果は JSON 文字列として
+    `value` 属性に保存する。`expires_at` は DynamoDB の TTL 属性として使う。
+    """
+
+    def __init__(self, table_name):
+        self.table = boto3.resource('dynamodb').Table(table_name)
+
+    def get(self, key):
+        try:
+            response = self.table.get_item(Key={'cache_key': key})
+        except ClientError as e:
+            log_error("Error retrieving content cache entry", cache_key=key, error=str(e))
+            return None
+        item = response.get('Item')
+        if not item:
+            return None
+        try:
+            return json.loads(item['value'])
+        except (KeyError, TypeError, ValueError) as e:
+            log_error("Invalid content cache entry, ignoring", cache_key=key, error=str(e))
+            return None
+
+    def put(self, key, value):
+        try:
+            self.table.put_item(Item={
+                'cache_key': key,
+                'value': json.dumps(value, ensure_ascii=False),
+                'expires_at': int(time.time()) + DYNAMODB_ENTRY_TTL
+            })
+        except ClientError as e:
+            log_error("Error saving content cache entry", cache_key=key, error=str(e))
+
+
+class TieredContentCache(ContentCache):
+    """
+    手前のキャッシュ（/tmp など）で見つからない場合だけ共有のキャッシュを参照するキャッシュ
+    """
+
+    def __init__(self, local, shared):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.put(key, value)
+        return value
+
+    def put(self, key, value):
+        self.local.put(key, value)
+        self.shared.put(key, value)
+
+
+def get_content_cache():
+    """
+    環境変数に応じたキャッシュを返す関数
+
+    `CONTENT_CACHE_DIR` が設定されていればそのディレクトリを、`CONTENT_CACHE_TABLE_NAME` が
+    設定されていれば /tmp の LRU キャッシュと DynamoDB を組み合わせたものを、どちらもなければ
+    /tmp の LRU キャッシュだけを使用する。
+
+    Returns:
+        ContentCache: キャッシュ
+    """
+    directory = os.environ.get('CONTENT_CACHE_DIR')
+    if directory:
+        return LocalDirectoryContentCache(directory)
+    table_name = os.environ.get('CONTENT_CACHE_TABLE_NAME')
+    if table_name:
+        return TieredContentCache(LRUContentCache(), DynamoDBContentCache(table_name))
+    return LRUContentCache()
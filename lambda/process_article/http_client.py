@@ -0,0 +1,93 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# ホストごとの接続プールの設定（プールの大きさはバッチの並列数より大きくしておく）
+#   timeout: (接続のタイムアウト, 読み込みのタイムアウト) の秒数
+HOST_POOL_SETTINGS = {
+    'aws.amazon.com': {'pool_maxsize': 10, 'timeout': (3.05, 15)},
+    'api.notion.com': {'pool_maxsize': 10, 'timeout': (3.05, 30)},
+}
+
+# 上記以外のホストに使う設定
+DEFAULT_POOL_SETTINGS = {'pool_maxsize': 4, 'timeout': (3.05, 15)}
+
+# 共有の HTTP セッション（ウォームスタート間で接続を使い回す）
+_session = None
+_session_lock = threading.Lock()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    タイムアウトの既定値を持ち、接続の再利用を数えられる HTTPAdapter
+    """
+
+    def __init__(self, timeout, pool_maxsize):
+        self.timeout = timeout
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout or self.timeout, **kwargs)
+
+    def connection_stats(self):
+        """
+        この adapter が持つ接続プールごとの接続数とリクエスト数を返す
+
+        Returns:
+            dict: ホストと {'requests', 'new_connections', 'reused_connections'} の対応
+        """
+        stats = {}
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host_stats = stats.setdefault(pool.host, {'requests': 0, 'new_connections': 0})
+            host_stats['requests'] += pool.num_requests
+            host_stats['new_connections'] += pool.num_connections
+        for host_stats in stats.values():
+            host_stats['reused_connections'] = max(host_stats['requests'] - host_stats['new_connections'], 0)
+        return stats
+
+
+def get_session():
+    """
+    共有の HTTP セッションを返す関数
+
+    HOST_POOL_SETTINGS のホストにはそれぞれ専用の接続プールを割り当て、
+    gzip（brotli が使えれば br も）で圧縮された応答を受け付ける。
+
+    Returns:
+        requests.Session: HTTP セッション
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+            session.mount('https://', PooledHTTPAdapter(**DEFAULT_POOL_SETTINGS))
+            session.mount('http://', PooledHTTPAdapter(**DEFAULT_POOL_SETTINGS))
+            for host, settings in HOST_POOL_SETTINGS.items():
+                session.mount(f'https://{host}/', PooledHTTPAdapter(**settings))
+            _session = session
+        return _session
+
+
+def connection_stats():
+    """
+    共有の HTTP セッションの接続の再利用状況を返す関数
+
+    値はコンテナの起動時からの累計で、ウォームスタートをまたいで増えていく。
+
+    Returns:
+        dict: ホストと {'requests', 'new_connections', 'reused_connections'} の対応
+    """
+    stats = {}
+    for adapter in get_session().adapters.values():
+        for host, host_stats in adapter.connection_stats().items():
+            total = stats.setdefault(host, {'requests': 0, 'new_connections': 0, 'reused_connections': 0})
+            for name, value in host_stats.items():
+                total[name] += value
+    return stats
+
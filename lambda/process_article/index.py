@@ -3,12 +3,16 @@ import json
 import logging
 import os
 import traceback
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
 
-from common import log_debug, log_info, log_error, get_parameter
+from common import log_debug, log_info, log_error, get_parameter, get_parameters
 from aws_services import get_aws_service_list
 from article_processing import process_article
-from notion_integration import add_to_notion
+from notion_integration import add_to_notion, get_notion_url_index
+from http_client import connection_stats
+from notion_client import notion_metrics
+from article_publisher import get_article_publisher
 
 # 環境変数から値を取得
 NOTION_API_KEY_PARAM = os.environ['NOTION_API_KEY_PARAM']
@@ -16,26 +20,136 @@ NOTION_DB_ID_PARAM = os.environ['NOTION_DB_ID_PARAM']
 OPENAI_API_KEY_PARAM = os.environ['OPENAI_API_KEY_PARAM']
 SERVICES_TABLE_NAME = os.environ['SERVICES_TABLE_NAME']
 
+# 記事の処理に必要な Parameter Store のパラメータ（1回の GetParameters でまとめて取得する）
+PARAMETER_NAMES = [NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM, OPENAI_API_KEY_PARAM]
+
+# バッチ処理時に並列で処理する記事数の上限
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '4'))
+
+# Notion の既存ページの URL インデックスに含める期間（fetch_news が記事を対象とする期間に合わせる）
+NOTION_INDEX_LOOKBACK_DAYS = int(os.environ.get('NOTION_INDEX_LOOKBACK_DAYS', '5'))
+
+# 処理済みの記事を Notion への追加に回すキュー（Noneの場合はこの関数の中で直接追加する）
+publisher = get_article_publisher()
+
 def handler(event, context):
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
     log_info(f"Received event: {json.dumps(event)}")
 
+    # {"articles": [...]} の場合は複数の記事をまとめて処理する
+    if 'articles' in event:
+        return {
+            'results': process_batch(event['articles'])
+        }
+    return process_event(event)
+
+def process_batch(articles):
+    """
+    複数の記事を共有の状態を使ってスレッドプールで処理する関数
+
+    サービス一覧と Notion の既存ページの URL インデックスはバッチの開始時に一度だけ取得する。
+    Parameter Store の値はウォームスタート間でキャッシュされ、期限切れの場合だけまとめて取得し直す。
+
+    Args:
+        articles (list): 処理する記事の情報のリスト
+
+    Returns:
+        list: 記事ごとの処理結果のリスト（入力と同じ順）
+    """
+    if not articles:
+        return []
+
+    log_info("Starting batch processing", article_count=len(articles))
+    try:
+        get_parameters(PARAMETER_NAMES)
+        services = get_aws_service_list(SERVICES_TABLE_NAME)
+        since = datetime.now(timezone.utc) - timedelta(days=NOTION_INDEX_LOOKBACK_DAYS)
+        url_index = get_notion_url_index(NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM, since)
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(articles))) as executor:
+            results = list(executor.map(lambda article: process_event(article, services, url_index), articles))
+    except Exception as e:
+        # 共有の状態を取得できない場合はすべての記事を失敗として返す
+        response = error_response(e)
+        return [response for _ in articles]
+
+    log_info("Batch processing completed", article_count=len(articles),
+             failed_count=sum(1 for result in results if result['statusCode'] != 200),
+             http_connections=connection_stats(),
+             notion_api=notion_metrics())
+    return results
+
+def process_event(event, services=None, url_index=None):
+    """
+    1件の記事を処理してNotionに追加する関数
+
+    Args:
+        event (dict): 処理する記事の情報
+        services (tuple): 取得済みの (service_list, service_dict)、未取得の場合はNone
+        url_index (NotionUrlIndex): Notion の既存ページの URL インデックス、ない場合はNone
+
+    Returns:
+        dict: statusCode と JSON 文字列の body を持つ処理結果
+    """
     try:
         log_debug("Starting article processing",
                   article_title=event['title'],
                   article_link=event['link'])
 
-        service_list, service_dict = get_aws_service_list(SERVICES_TABLE_NAME)
-        
+        # Notion に追加済みの記事はスクレイピングや LLM の呼び出しの前にスキップする
+        if url_index is not None and url_index.covers(event.get('published')):
+            existing_page_id = url_index.get(event['link'])
+            if existing_page_id:
+                result = {
+                    'articleTitle': event['title'],
+                    'tags': [],
+                    'addedToNotion': True,
+                    'notionPageId': existing_page_id,
+                    'skipped': True
+                }
+                log_info("Article already exists in Notion, skipping processing", result=result)
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps(result)
+                }
+
+        if services is None:
+            get_parameters(PARAMETER_NAMES)
+            services = get_aws_service_list(SERVICES_TABLE_NAME)
+        service_list, service_dict = services
+
         # process_article 関数を使用して記事を処理
         processed_article = process_article(event, service_list, service_dict, OPENAI_API_KEY_PARAM)
-        
+        if 'error' in processed_article:
+            # 処理に失敗した記事はキューにも Notion にも送らない
+            error_info = {'error': processed_article['error']}
+            log_error("Error processing article", article_link=event['link'], error_info=error_info)
+            return {
+                'statusCode': 500,
+                'body': json.dumps(error_info)
+            }
+
         # 公開日時をprocessed_articleに追加
         processed_article['published'] = event.get('published')
 
+        # キューがあれば Notion への追加は notion_publisher に任せる（大きすぎる記事や、送信に失敗した記事はここで追加する）
+        if publisher is not None and publisher.publish(processed_article):
+            result = {
+                'articleTitle': processed_article['title'],
+                'tags': processed_article['tags'],
+                'addedToNotion': False,
+                'queuedForNotion': True,
+                'notionPageId': None,
+                'skipped': False
+            }
+            log_info("Article queued for Notion", result=result)
+            return {
+                'statusCode': 200,
+                'body': json.dumps(result)
+            }
+
         # Notionに追加（または既存ページIDを取得）
-        notion_result = add_to_notion(processed_article, NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM)
+        notion_result = add_to_notion(processed_article, NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM, url_index)
 
         result = {
             'articleTitle': processed_article['title'],
@@ -50,12 +164,15 @@ def handler(event, context):
             'body': json.dumps(result)
         }
     except Exception as e:
-        error_info = {
-            'error': str(e),
-            'trace': traceback.format_exc()
-        }
-        log_error("Error processing article", error_info=error_info)
-        return {
-            'statusCode': 500,
-            'body': json.dumps(error_info)
-        }
\ No newline at end of file
+        return error_response(e)
+
+def error_response(e):
+    error_info = {
+        'error': str(e),
+        'trace': traceback.format_exc()
+    }
+    log_error("Error processing article", error_info=error_info)
+    return {
+        'statusCode': 500,
+        'body': json.dumps(error_info)
+    }
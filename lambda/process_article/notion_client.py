@@ -0,0 +1,239 @@
+import os
+import random
+import threading
+import time
+import boto3
+from botocore.exceptions import ClientError
+from common import log_debug, log_error
+from http_client import get_session
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+
+# Notion API の1インテグレーションあたりのリクエスト数の上限（毎秒）
+NOTION_REQUESTS_PER_SECOND = float(os.environ.get('NOTION_REQUESTS_PER_SECOND', '3'))
+
+# 同時に実行される Lambda 間でリクエスト数を調整する DynamoDB テーブル（未設定ならコンテナ内だけで制限する）
+NOTION_RATE_LIMIT_TABLE_NAME = os.environ.get('NOTION_RATE_LIMIT_TABLE_NAME')
+
+# 再試行するステータスコード（レート制限、競合、サーバーエラー）
+RETRY_STATUS_CODES = frozenset({409, 429, 500, 502, 503, 504})
+
+# ページの作成やブロックの追記のように冪等でないリクエストで再試行するステータスコード
+# （429 は処理されずに拒否されたことが確実だが、409・5xx は作成や追記が適用済みの場合がある）
+NON_IDEMPOTENT_RETRY_STATUS_CODES = frozenset({429})
+
+# 再試行の回数と、Retry-After がない場合の待ち時間（指数バックオフの基準と上限の秒数）
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+# DynamoDB のカウンタを残す秒数
+RATE_LIMIT_ENTRY_TTL = 60
+
+
+class TokenBucket:
+    """
+    コンテナ内のスレッドで共有するトークンバケット
+
+    rate 個/秒でトークンが補充され、最大 capacity 個までバーストを許す。
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        トークンを1つ取得する（取得できるまで待つ）
+
+        Returns:
+            float: 待った秒数
+        """
+        waited = 0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                # 停止中はトークンを補充しない（停止の解除後にバーストしないようにする）
+                self.tokens = min(self.capacity, self.tokens + max(now - self.updated_at, 0) * self.rate)
+                self.updated_at = max(now, self.updated_at)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """
+        Retry-After などで指定された間、すべてのスレッドのトークンの取得を止める
+
+        Args:
+            seconds (float): 止める秒数
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.updated_at = max(self.updated_at, self.paused_until)
+            self.tokens = 0
+
+
+class DynamoDBRateLimiter:
+    """
+    DynamoDB の1秒ごとのカウンタで、同時に実行される Lambda 全体のリクエスト数を制限する
+
+    テーブルは文字列のパーティションキー `limiter_key` を持ち、`expires_at` を TTL 属性として使う。
+    """
+
+    def __init__(self, table_name, rate, name="notion"):
+        self.table_name = table_name
+        self.limit = max(int(rate), 1)
+        self.name = name
+        self.client = boto3.client('dynamodb')
+
+    def acquire(self):
+        """
+        現在の1秒の枠に空きができるまで待ってから、枠を1つ使う
+
+        Returns:
+            float: 待った秒数
+        """
+        waited = 0
+        while True:
+            now = time.time()
+            window = int(now)
+            try:
+                self.client.update_item(
+                    TableName=self.table_name,
+                    Key={'limiter_key': {'S': f"{self.name}:{window}"}},
+                    UpdateExpression="ADD request_count :one SET expires_at = :expires_at",
+                    ConditionExpression="attribute_not_exists(request_count) OR request_count < :limit",
+                    ExpressionAttributeValues={
+                        ':one': {'N': '1'},
+                        ':limit': {'N': str(self.limit)},
+                        ':expires_at': {'N': str(window + RATE_LIMIT_ENTRY_TTL)}
+                    }
+                )
+                return waited
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    # 調整用のテーブルが使えない場合はコンテナ内の制限だけで続ける
+                    log_error("Error updating rate limit counter", error=str(e))
+                    return waited
+            delay = window + 1 - now + random.uniform(0, 0.05)
+            time.sleep(delay)
+            waited += delay
+
+
+class NotionMetrics:
+    """
+    Notion API の呼び出し回数と、レート制限で待った時間の累計
+
+    待った時間はスレッドごとの待ち時間の合計なので、並列に待つと実時間より大きくなる。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'retries': 0, 'throttled_responses': 0, 'throttled_seconds': 0.0}
+
+    def add(self, **values):
+        with self.lock:
+            for name, value in values.items():
+                self.counts[name] += value
+
+    def snapshot(self):
+        with self.lock:
+            counts = dict(self.counts)
+        counts['throttled_seconds'] = round(counts['throttled_seconds'], 3)
+        return counts
+
+
+# コンテナ内で共有する HTTP セッション、レート制限、メトリクス
+session = get_session()
+bucket = TokenBucket(NOTION_REQUESTS_PER_SECOND)
+shared_limiter = (
+    DynamoDBRateLimiter(NOTION_RATE_LIMIT_TABLE_NAME, NOTION_REQUESTS_PER_SECOND)
+    if NOTION_RATE_LIMIT_TABLE_NAME else None
+)
+metrics = NotionMetrics()
+
+
+def notion_request(method, path, notion_api_key, payload=None, retry_status_codes=RETRY_STATUS_CODES):
+    """
+    レート制限を守って Notion API を呼び出す関数
+
+    リクエストごとにトークンバケット（設定されていれば DynamoDB のカウンタも）で待ち、
+    retry_status_codes（既定では 429・409・5xx）の応答は Retry-After（なければジッター付きの指数バックオフ）だけ待って再試行する。
+
+    Args:
+        method (str): HTTP メソッド
+        path (str): /v1 以降のパス（例: "pages"）
+        notion_api_key (str): Notion API キー
+        payload (dict): JSON で送る本文
+        retry_status_codes (frozenset): 再試行するステータスコード
+            （冪等でないリクエストには NON_IDEMPOTENT_RETRY_STATUS_CODES を渡す）
+
+    Returns:
+        requests.Response: 成功した応答
+
+    Raises:
+        requests.exceptions.RequestException: 再試行しても成功しなかった場合
+    """
+    headers = {
+        "Authorization": f"Bearer {notion_api_key}",
+        "Content-Type": "application/json",
+        "Notion-Version": NOTION_VERSION
+    }
+    for attempt in range(MAX_RETRIES + 1):
+        waited = bucket.acquire()
+        if shared_limiter is not None:
+            waited += shared_limiter.acquire()
+        metrics.add(requests=1, throttled_seconds=waited)
+
+        response = session.request(method, f"{NOTION_API_URL}/{path}", headers=headers, json=payload)
+        if response.status_code not in retry_status_codes or attempt == MAX_RETRIES:
+            response.raise_for_status()
+            return response
+
+        delay = retry_delay(response, attempt)
+        if response.status_code == 429:
+            # 他のスレッドも含めて、指定された時間はリクエストを止める
+            bucket.pause(delay)
+            metrics.add(throttled_responses=1)
+        log_debug("Retrying Notion API request", path=path, status_code=response.status_code,
+                  attempt=attempt + 1, delay=round(delay, 3))
+        metrics.add(retries=1, throttled_seconds=delay)
+        time.sleep(delay)
+
+
+def retry_delay(response, attempt):
+    """
+    再試行までの待ち時間を返す関数
+
+    Args:
+        response (requests.Response): 再試行の対象の応答
+        attempt (int): 0 から数えた試行の回数
+
+    Returns:
+        float: 待つ秒数
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(float(retry_after), 0) + random.uniform(0, BACKOFF_BASE)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def notion_metrics():
+    """
+    Notion API の呼び出しの累計を返す関数（コンテナの起動時から）
+
+    Returns:
+        dict: requests、retries、throttled_responses、throttled_seconds の値
+    """
+    return metrics.snapshot()
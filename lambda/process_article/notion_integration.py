@@ -1,9 +1,70 @@
+import re
+import threading
+import time
 import requests
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 import json
-from common import log_debug, log_info, log_error, get_parameter
+from common import log_debug, log_info, log_error, get_parameter, invalidate_parameters
+from notion_client import notion_request, NON_IDEMPOTENT_RETRY_STATUS_CODES
 
-def add_to_notion(processed_article, notion_api_key_param, notion_db_id_param):
+# Notion の rich_text 1要素に入れられる最大文字数
+NOTION_TEXT_LIMIT = 2000
+
+# 1回のリクエストで送るブロック数の上限（Notion API の children の上限）
+NOTION_BLOCK_LIMIT = 100
+
+# 1回のリクエストで送るテキストの合計文字数の上限（日本語でもリクエストの上限 500KB に収まるようにする）
+NOTION_REQUEST_TEXT_LIMIT = 100000
+
+# 段落の区切り（空行）と文の区切り（日本語の句点などと、空白が続く英語の終止符）
+PARAGRAPH_BREAK_PATTERN = re.compile(r'\n\s*\n')
+SENTENCE_BREAK_PATTERN = re.compile(r'[。！？]+[」』）)]*\s*|[.!?]+["\')]*\s+')
+
+# URL インデックスをウォームスタート間で使い回す秒数（同じ実行の後続バッチで再利用する）
+NOTION_URL_INDEX_TTL = 600
+
+# URL インデックスの取得時に、公開日時の境界の前に余分に含める期間（日付単位の比較への備え）
+NOTION_URL_INDEX_MARGIN = timedelta(days=1)
+
+# 作成済みの URL インデックス
+_url_index = None
+_url_index_lock = threading.Lock()
+
+
+class NotionUrlIndex:
+    """
+    公開日時が一定の日時以降の Notion ページについて、URL とページ ID を対応付けるインデックス
+
+    since より前に公開された記事はインデックスの対象外なので、個別に問い合わせる必要がある。
+    """
+
+    def __init__(self, db_id, since, pages):
+        self.db_id = db_id
+        self.since = since
+        self.pages = pages
+        self.loaded_at = time.monotonic()
+
+    def covers(self, published):
+        """
+        公開日時がインデックスの対象期間に含まれるかどうかを返す
+
+        Args:
+            published (str): ISO 形式の公開日時
+
+        Returns:
+            bool: 対象期間に含まれる場合はTrue
+        """
+        published_date = parse_published(published)
+        return published_date is not None and published_date >= self.since
+
+    def get(self, link):
+        return self.pages.get(link)
+
+    def add(self, link, page_id):
+        self.pages[link] = page_id
+
+def add_to_notion(processed_article, notion_api_key_param, notion_db_id_param, url_index=None,
+                  retry_on_auth_failure=True):
     """
     処理された記事の内容をNotionデータベースに追加する関数
 
@@ -11,6 +72,8 @@ def add_to_notion(processed_article, notion_api_key_param, notion_db_id_param):
         processed_article (dict): 処理された記事の情報
         notion_api_key_param (str): Notion API キーを格納するパラメータ名
         notion_db_id_param (str): Notion データベース ID を格納するパラメータ名
+        url_index (NotionUrlIndex): 既存ページの確認に使うインデックス、個別に問い合わせる場合はNone
+        retry_on_auth_failure (bool): 認証エラー時にパラメータを読み直して1回だけ再試行するかどうか
 
     Returns:
         str: 作成されたNotionページのID、既存ページの場合はそのID、エラー時はNone
@@ -18,89 +81,21 @@ def add_to_notion(processed_article, notion_api_key_param, notion_db_id_param):
     notion_api_key = get_parameter(notion_api_key_param)
     db_id = get_parameter(notion_db_id_param)
 
-    headers = {
-        "Authorization": f"Bearer {notion_api_key}",
-        "Content-Type": "application/json",
-        "Notion-Version": "2022-06-28"
-    }
-
-    # 既存のページをチェック
-    existing_page_id = check_existing_notion_page(notion_api_key, db_id, processed_article['link'])
+    # 既存のページをチェック（インデックスの対象期間内であれば問い合わせない）
+    if url_index is not None and url_index.covers(processed_article.get('published')):
+        existing_page_id = url_index.get(processed_article['link'])
+    else:
+        existing_page_id = check_existing_notion_page(notion_api_key, db_id, processed_article['link'])
     if existing_page_id:
         log_info("Article already exists in Notion, skipping addition", article_link=processed_article['link'])
         return existing_page_id
 
-    def split_content(content, max_length=2000):
-        words = content.split()
-        chunks = []
-        current_chunk = []
-
-        for word in words:
-            if len(' '.join(current_chunk + [word])) <= max_length:
-                current_chunk.append(word)
-            else:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-
-        return chunks
-
-    content_blocks = split_content(processed_article['translated_content'])
-    original_blocks = split_content(processed_article['original_content'])
-
-    children = [
-        {"object": "block", "type": "heading_2", "heading_2": {
-            "rich_text": [{"type": "text", "text": {"content": "要約"}}]
-        }},
-    ] + [
-        {"object": "block", "type": "bulleted_list_item", "bulleted_list_item": {
-            "rich_text": [{"type": "text", "text": {"content": line.lstrip('- ')}}]
-        }}
-        for line in processed_article['summary'].split('\n') if line.strip()
-    ] + [
-        {"object": "block", "type": "heading_2", "heading_2": {
-            "rich_text": [{"type": "text", "text": {"content": "内容"}}]
-        }},
-    ] + [
-        {"object": "block", "type": "paragraph", "paragraph": {
-            "rich_text": [{"type": "text", "text": {"content": block}}]
-        }}
-        for block in content_blocks
-    ] + [
-        {"object": "block", "type": "heading_2", "heading_2": {
-            "rich_text": [{"type": "text", "text": {"content": "参考"}}]
-        }},
-    ] + [
-        {"object": "block", "type": "bulleted_list_item", "bulleted_list_item": {
-            "rich_text": [{"type": "text", "text": {"content": url}}]
-        }}
-        for url in processed_article['urls']
-    ] + [
-        {"object": "block", "type": "heading_2", "heading_2": {
-            "rich_text": [{"type": "text", "text": {"content": "原文"}}]
-        }},
-    ] + [
-        {"object": "block", "type": "paragraph", "paragraph": {
-            "rich_text": [{"type": "text", "text": {"content": block}}]
-        }}
-        for block in original_blocks
-    ]
-
     # 公開日時の処理
-    if 'published' in processed_article and processed_article['published']:
-        try:
-            published_date = datetime.fromisoformat(processed_article['published'].replace('Z', '+00:00'))
-            iso_date = published_date.isoformat()
-        except ValueError:
-            log_debug("Invalid date format, using current time", date=processed_article['published'])
-            published_date = datetime.now(timezone.utc)
-            iso_date = published_date.isoformat()
-    else:
-        log_debug("No published date provided, using current time")
+    published_date = parse_published(processed_article.get('published'))
+    if published_date is None:
+        log_debug("No valid published date provided, using current time", date=processed_article.get('published'))
         published_date = datetime.now(timezone.utc)
-        iso_date = published_date.isoformat()
+    iso_date = published_date.isoformat()
 
     data = {
         "parent": {"database_id": db_id},
@@ -114,8 +109,7 @@ def add_to_notion(processed_article, notion_api_key_param, notion_db_id_param):
             "公開日時": {
                 "date": {"start": iso_date}
             }
-        },
-        "children": children
+        }
     }
 
     if processed_article['tags']:
@@ -123,20 +117,179 @@ def add_to_notion(processed_article, notion_api_key_param, notion_db_id_param):
             "multi_select": [{"name": tag} for tag in processed_article['tags']]
         }
 
+    # 本文のブロックは順に生成し、最初のバッチだけをページの作成時に送る
+    batches = _block_batches(iter_page_blocks(processed_article))
+    data["children"] = next(batches, [])
+
     try:
-        response = requests.post("https://api.notion.com/v1/pages", headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()["id"]
+        # ページの作成は冪等でないため、作成済みの可能性がある 409・5xx では再試行しない
+        response = notion_request("POST", "pages", notion_api_key, data,
+                                  retry_status_codes=NON_IDEMPOTENT_RETRY_STATUS_CODES)
+        page_id = response.json()["id"]
     except requests.exceptions.RequestException as e:
-        log_debug(
+        if retry_on_auth_failure and e.response is not None and e.response.status_code == 401:
+            # キャッシュした API キーが古くなった可能性があるため、読み直して再試行する
+            invalidate_parameters(notion_api_key_param, notion_db_id_param)
+            return add_to_notion(processed_article, notion_api_key_param, notion_db_id_param, url_index,
+                                 retry_on_auth_failure=False)
+        log_error(
             "Error adding to Notion",
             error=str(e),
-            status_code=e.response.status_code if hasattr(e, 'response') else None,
-            content=e.response.content.decode('utf-8') if hasattr(e, 'response') else None,
+            status_code=e.response.status_code if e.response is not None else None,
+            content=e.response.content.decode('utf-8') if e.response is not None else None,
             request_data=json.dumps(data, ensure_ascii=False)
         )
         return None
 
+    # 残りのブロックを順に追記する（同じページへの追記は順序を保つため1つずつ送る）
+    # 追記も冪等でないため、適用済みの可能性がある 409・5xx では再試行せずにアーカイブする
+    try:
+        for batch in batches:
+            notion_request("PATCH", f"blocks/{page_id}/children", notion_api_key, {"children": batch},
+                           retry_status_codes=NON_IDEMPOTENT_RETRY_STATUS_CODES)
+    except requests.exceptions.RequestException as e:
+        log_error("Error appending blocks to Notion page", error=str(e), page_id=page_id,
+                  status_code=e.response.status_code if e.response is not None else None)
+        # 途中までのページが既存ページとして扱われないよう、アーカイブして次回の実行で作り直す
+        archive_notion_page(notion_api_key, page_id)
+        return None
+
+    if url_index is not None:
+        url_index.add(processed_article['link'], page_id)
+    return page_id
+
+def iter_page_blocks(processed_article):
+    """
+    記事のページの本文のブロックを、要約・内容・参考・原文の順に1つずつ生成する関数
+
+    Args:
+        processed_article (dict): 処理された記事の情報
+
+    Yields:
+        dict: Notion のブロック
+    """
+    yield _text_block("heading_2", "要約")
+    for line in processed_article['summary'].split('\n'):
+        if line.strip():
+            yield _text_block("bulleted_list_item", line.lstrip('- '))
+    yield _text_block("heading_2", "内容")
+    for chunk in iter_content_chunks(processed_article['translated_content']):
+        yield _text_block("paragraph", chunk)
+    yield _text_block("heading_2", "参考")
+    for url in processed_article['urls']:
+        yield _text_block("bulleted_list_item", url)
+    yield _text_block("heading_2", "原文")
+    for chunk in iter_content_chunks(processed_article['original_content']):
+        yield _text_block("paragraph", chunk)
+
+def archive_notion_page(notion_api_key, page_id):
+    """
+    Notion のページをアーカイブする関数
+
+    Args:
+        notion_api_key (str): Notion API キー
+        page_id (str): アーカイブするページのID
+    """
+    try:
+        notion_request("PATCH", f"pages/{page_id}", notion_api_key, {"archived": True})
+        log_info("Archived incomplete Notion page", page_id=page_id)
+    except requests.exceptions.RequestException as e:
+        log_error("Error archiving incomplete Notion page", error=str(e), page_id=page_id)
+
+def _text_block(block_type, text):
+    return {"object": "block", "type": block_type, block_type: {
+        "rich_text": [{"type": "text", "text": {"content": text}}]
+    }}
+
+def _block_batches(blocks):
+    # 1回のリクエストで送れるブロック数と文字数に収まるようにまとめて返す
+    batch = []
+    batch_length = 0
+    for block in blocks:
+        text_length = len(block[block["type"]]["rich_text"][0]["text"]["content"])
+        if batch and (len(batch) >= NOTION_BLOCK_LIMIT or batch_length + text_length > NOTION_REQUEST_TEXT_LIMIT):
+            yield batch
+            batch = []
+            batch_length = 0
+        batch.append(block)
+        batch_length += text_length
+    if batch:
+        yield batch
+
+def get_notion_url_index(notion_api_key_param, notion_db_id_param, since):
+    """
+    公開日時が since 以降のページの URL インデックスを返す関数
+
+    データベースを公開日時で絞り込んで1回だけページ送りで取得し、同じコンテナでは
+    NOTION_URL_INDEX_TTL 秒の間、同じ実行の後続バッチのために使い回す。
+
+    Args:
+        notion_api_key_param (str): Notion API キーを格納するパラメータ名
+        notion_db_id_param (str): Notion データベース ID を格納するパラメータ名
+        since (datetime): インデックスの対象とする公開日時の下限
+
+    Returns:
+        NotionUrlIndex: URL インデックス、取得に失敗した場合はNone
+    """
+    global _url_index
+    db_id = get_parameter(notion_db_id_param)
+    with _url_index_lock:
+        if (_url_index is not None and _url_index.db_id == db_id and _url_index.since <= since
+                and time.monotonic() - _url_index.loaded_at < NOTION_URL_INDEX_TTL):
+            log_debug("Notion URL index cache hit", page_count=len(_url_index.pages))
+            return _url_index
+
+        notion_api_key = get_parameter(notion_api_key_param)
+        data = {
+            "filter": {
+                "property": "公開日時",
+                "date": {
+                    "on_or_after": (since - NOTION_URL_INDEX_MARGIN).date().isoformat()
+                }
+            },
+            "page_size": 100
+        }
+
+        pages = {}
+        try:
+            while True:
+                response = notion_request("POST", f"databases/{db_id}/query", notion_api_key, data)
+                body = response.json()
+                for page in body.get("results", []):
+                    link = page.get("properties", {}).get("URL", {}).get("url")
+                    if link:
+                        pages[link] = page["id"]
+                if not body.get("has_more"):
+                    break
+                data["start_cursor"] = body["next_cursor"]
+        except requests.exceptions.RequestException as e:
+            log_error("Error loading Notion URL index", error=str(e))
+            return None
+
+        _url_index = NotionUrlIndex(db_id, since, pages)
+        log_info("Loaded Notion URL index", page_count=len(pages), since=since.isoformat())
+        return _url_index
+
+def parse_published(published):
+    """
+    ISO 形式の公開日時を datetime に変換する関数
+
+    Args:
+        published (str): ISO 形式の公開日時
+
+    Returns:
+        datetime: タイムゾーン付きの公開日時、空または不正な形式の場合はNone
+    """
+    if not published:
+        return None
+    try:
+        published_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if published_date.tzinfo is None:
+        published_date = published_date.replace(tzinfo=timezone.utc)
+    return published_date
+
 def check_existing_notion_page(notion_api_key, db_id, article_link):
     """
     Notionデータベース内に同じリンクを持つページが存在するかチェックする関数
@@ -149,12 +302,6 @@ def check_existing_notion_page(notion_api_key, db_id, article_link):
     Returns:
         str: 既存ページのID、存在しない場合はNone
     """
-    headers = {
-        "Authorization": f"Bearer {notion_api_key}",
-        "Content-Type": "application/json",
-        "Notion-Version": "2022-06-28"
-    }
-
     data = {
         "filter": {
             "property": "URL",
@@ -165,8 +312,7 @@ def check_existing_notion_page(notion_api_key, db_id, article_link):
     }
 
     try:
-        response = requests.post(f"https://api.notion.com/v1/databases/{db_id}/query", headers=headers, json=data)
-        response.raise_for_status()
+        response = notion_request("POST", f"databases/{db_id}/query", notion_api_key, data)
         results = response.json().get("results", [])
         if results:
             log_debug("Found existing Notion page", article_link=article_link, page_id=results[0]["id"])
@@ -175,4 +321,75 @@ def check_existing_notion_page(notion_api_key, db_id, article_link):
         return None
     except requests.exceptions.RequestException as e:
         log_error("Error checking existing Notion page", error=str(e), article_link=article_link)
-        return None
\ No newline at end of file
+        return None
+
+def iter_content_chunks(content, max_length=NOTION_TEXT_LIMIT):
+    """
+    本文を Notion のブロックに入る長さのチャンクに分割して順に返す関数
+
+    段落をできるだけまとめて詰め、1段落が長すぎる場合は文（句点「。」を含む）の区切りで、
+    1文が長すぎる場合は空白で、空白もなければ文字数で分割する。本文を1回走査するだけで分割する。
+
+    Args:
+        content (str): 分割する本文
+        max_length (int): 1チャンクの最大文字数
+
+    Yields:
+        str: チャンク
+    """
+    current = []
+    current_length = 0
+    for separator, segment in _segments(content, max_length):
+        if current and current_length + len(separator) + len(segment) <= max_length:
+            current.append(separator)
+            current.append(segment)
+            current_length += len(separator) + len(segment)
+        else:
+            chunk = ''.join(current).strip()
+            if chunk:
+                yield chunk
+            current = [segment]
+            current_length = len(segment)
+    chunk = ''.join(current).strip()
+    if chunk:
+        yield chunk
+
+def _segments(content, max_length):
+    # (直前のセグメントとの区切り文字, max_length 以下のセグメント) を順に返す
+    for paragraph in _paragraphs(content):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_length:
+            yield '\n\n', paragraph
+            continue
+        separator = '\n\n'
+        for sentence in _sentences(paragraph):
+            for piece in _split_long_text(sentence, max_length):
+                yield separator, piece
+                separator = ''
+
+def _paragraphs(content):
+    start = 0
+    for match in PARAGRAPH_BREAK_PATTERN.finditer(content):
+        yield content[start:match.start()]
+        start = match.end()
+    yield content[start:]
+
+def _sentences(paragraph):
+    start = 0
+    for match in SENTENCE_BREAK_PATTERN.finditer(paragraph):
+        yield paragraph[start:match.end()]
+        start = match.end()
+    if start < len(paragraph):
+        yield paragraph[start:]
+
+def _split_long_text(text, max_length):
+    start = 0
+    while len(text) - start > max_length:
+        cut = text.rfind(' ', start, start + max_length)
+        cut = cut + 1 if cut > start else start + max_length
+        yield text[start:cut]
+        start = cut
+    if start < len(text):
+        yield text[start:]
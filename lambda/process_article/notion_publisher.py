@@ -0,0 +1,77 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from common import log_info, log_error, get_parameters
+from article_publisher import decode_record
+from notion_integration import add_to_notion, get_notion_url_index
+from notion_client import notion_metrics
+
+# 環境変数から値を取得
+NOTION_API_KEY_PARAM = os.environ['NOTION_API_KEY_PARAM']
+NOTION_DB_ID_PARAM = os.environ['NOTION_DB_ID_PARAM']
+
+# 並列に Notion に追加する記事数の上限（実際の速度は notion_client のレート制限で決まる）
+PUBLISH_MAX_WORKERS = int(os.environ.get('PUBLISH_MAX_WORKERS', '3'))
+
+# Notion の既存ページの URL インデックスに含める期間
+NOTION_INDEX_LOOKBACK_DAYS = int(os.environ.get('NOTION_INDEX_LOOKBACK_DAYS', '5'))
+
+def handler(event, context):
+    """
+    SQS キューから受け取った処理済みの記事を Notion に追加する関数
+
+    追加に失敗した記事のメッセージは batchItemFailures として返し、SQS に再配信させる。
+
+    Args:
+        event (dict): SQS のイベント
+        context: Lambda のコンテキスト
+
+    Returns:
+        dict: 失敗したメッセージの ID を含む batchItemFailures
+    """
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    records = event.get('Records', [])
+    if not records:
+        return {'batchItemFailures': []}
+
+    log_info("Publishing articles to Notion", record_count=len(records))
+    get_parameters([NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM])
+    since = datetime.now(timezone.utc) - timedelta(days=NOTION_INDEX_LOOKBACK_DAYS)
+    url_index = get_notion_url_index(NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM, since)
+
+    with ThreadPoolExecutor(max_workers=min(PUBLISH_MAX_WORKERS, len(records))) as executor:
+        page_ids = list(executor.map(lambda record: publish_record(record, url_index), records))
+
+    failures = [
+        {'itemIdentifier': record['messageId']}
+        for record, page_id in zip(records, page_ids) if page_id is None
+    ]
+    log_info("Publishing completed", record_count=len(records), failed_count=len(failures),
+             notion_api=notion_metrics())
+    return {'batchItemFailures': failures}
+
+def publish_record(record, url_index):
+    """
+    1件のメッセージの記事を Notion に追加する関数
+
+    Args:
+        record (dict): SQS のレコード
+        url_index (NotionUrlIndex): Notion の既存ページの URL インデックス、ない場合はNone
+
+    Returns:
+        str: NotionページのID、失敗した場合はNone
+    """
+    try:
+        processed_article = decode_record(record['body'])
+    except Exception as e:
+        log_error("Invalid publish queue message", message_id=record.get('messageId'), error=str(e))
+        return None
+    try:
+        return add_to_notion(processed_article, NOTION_API_KEY_PARAM, NOTION_DB_ID_PARAM, url_index)
+    except Exception as e:
+        log_error("Error publishing article to Notion", article_link=processed_article.get('link'),
+                  message_id=record.get('messageId'), error=str(e))
+        return None
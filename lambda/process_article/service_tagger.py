@@ -0,0 +1,235 @@
+import math
+import re
+from collections import Counter, deque
+from common import log_debug
+
+# タイトルと本文での出現に対する重み（タイトルの出現を優先する）
+TITLE_WEIGHT = 3
+BODY_WEIGHT = 1
+
+# ローカルで確定するのに必要な最低スコア（タイトルに出現せず、本文に1回出現しただけのサービスは LLM に任せる）
+MIN_LOCAL_SCORE = 2 * BODY_WEIGHT
+
+# タイトルで最初に出現したサービスへの加点（"Amazon X now supports Amazon Y" では X を主題とみなす）
+FIRST_TITLE_BONUS = 1
+
+# プレフィックス（Amazon / AWS）を除いた名前もパターンに加える
+SERVICE_PREFIXES = ("Amazon ", "AWS ")
+
+# LLM に渡す候補の最大数
+CANDIDATE_LIMIT = 15
+
+# 候補の検索で単語と文字トライグラムの一致に与える重み
+TOKEN_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.2
+
+# 候補の検索で無視する単語（多くのサービス名に共通して含まれる）
+STOP_WORDS = frozenset({
+    'a', 'amazon', 'and', 'aws', 'for', 'in', 'new', 'now', 'of', 'on', 'service', 'services', 'the', 'to', 'with',
+})
+
+# 作成済みのタガー（同じ service_dict に対しては使い回す）
+_tagger_cache = None
+
+
+class ServiceTagger:
+    """
+    サービス名と略称を Aho-Corasick 法で照合し、記事のタグを決める
+
+    service_dict のサービス名と略称をすべてパターンとして1つのオートマトンにまとめ、
+    タイトルと本文を1回ずつ走査して出現した略称を数える。あわせて、LLM に渡す候補を
+    絞り込むための単語と文字トライグラムの転置インデックスを持つ。
+    """
+
+    def __init__(self, service_dict):
+        self.service_dict = service_dict
+        patterns = {}
+        self.index = {}
+        for service_name, abbreviation in service_dict.items():
+            for pattern in _service_patterns(service_name, abbreviation):
+                patterns.setdefault(pattern, set()).add(abbreviation)
+            for feature in _features(service_name) | _features(abbreviation):
+                self.index.setdefault(feature, set()).add(abbreviation)
+
+        # 多くのサービスに共通する特徴ほど重みを小さくする
+        abbreviation_count = len(set(service_dict.values()))
+        self.weights = {
+            feature: (TOKEN_WEIGHT if feature[0] == 'token' else TRIGRAM_WEIGHT)
+            * math.log(1 + abbreviation_count / len(abbreviations))
+            for feature, abbreviations in self.index.items()
+        }
+
+        # 複数の略称に対応するパターンは曖昧なので使わない
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        for pattern, abbreviations in patterns.items():
+            if len(abbreviations) == 1:
+                self._add(pattern, abbreviations.pop())
+        self._build_failure_links()
+
+    def _add(self, pattern, abbreviation):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            node = next_node
+        self.output[node] = (len(pattern), abbreviation)
+
+    def _build_failure_links(self):
+        # 各ノードの出力は、失敗リンクをたどって到達できる出力も含むリストにする
+        self.output = [[output] if output else [] for output in self.output]
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """
+        テキスト中のサービス名の出現を返す
+
+        重なり合う出現は長いものを優先し、前後が英数字に続く出現は単語の一部として除く。
+
+        Args:
+            text (str): 走査するテキスト
+
+        Returns:
+            list: (開始位置, 終了位置, 略称) のリスト
+        """
+        matches = []
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, abbreviation in self.output[node]:
+                start = i + 1 - length
+                if _is_boundary(text, start - 1) and _is_boundary(text, i + 1):
+                    matches.append((start, i + 1, abbreviation))
+
+        matches.sort(key=lambda match: (match[0] - match[1], match[0]))
+        taken = []
+        covered = set()
+        for start, end, abbreviation in matches:
+            if not covered.intersection(range(start, end)):
+                covered.update(range(start, end))
+                taken.append((start, end, abbreviation))
+        return taken
+
+    def score(self, title, content):
+        """
+        タイトルと本文に出現した略称ごとのスコアを返す
+
+        Args:
+            title (str): 記事のタイトル
+            content (str): 記事の本文
+
+        Returns:
+            Counter: 略称とスコアの対応
+        """
+        scores = Counter()
+        title_matches = self.find(title)
+        for _, _, abbreviation in title_matches:
+            scores[abbreviation] += TITLE_WEIGHT
+        if title_matches:
+            scores[min(title_matches)[2]] += FIRST_TITLE_BONUS
+        for _, _, abbreviation in self.find(content):
+            scores[abbreviation] += BODY_WEIGHT
+        return scores
+
+    def tag(self, title, content):
+        """
+        スコアが最も高い略称を返す
+
+        Args:
+            title (str): 記事のタイトル
+            content (str): 記事の本文
+
+        Returns:
+            str: 確定できた略称。出現がない場合、最高スコアが MIN_LOCAL_SCORE 未満の場合、
+                最高スコアが並んだ場合はNone
+        """
+        ranked = self.score(title, content).most_common(2)
+        if not ranked:
+            return None
+        if ranked[0][1] < MIN_LOCAL_SCORE:
+            log_debug("Local tagger found only a single body mention", candidate=ranked[0][0])
+            return None
+        if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+            log_debug("Local tagger found a tie", candidates=', '.join(abbr for abbr, _ in ranked))
+            return None
+        return ranked[0][0]
+
+    def candidates(self, title, content, limit=CANDIDATE_LIMIT):
+        """
+        タイトルと本文に関連しそうな略称を上位から返す
+
+        Args:
+            title (str): 記事のタイトル
+            content (str): 記事の本文
+            limit (int): 返す略称の最大数
+
+        Returns:
+            list: スコアの高い順に並べた略称のリスト（関連するものがなければ空）
+        """
+        scores = Counter()
+        for text, weight in ((title, TITLE_WEIGHT), (content, BODY_WEIGHT)):
+            for feature in _features(text):
+                for abbreviation in self.index.get(feature, ()):
+                    scores[abbreviation] += weight * self.weights[feature]
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [abbreviation for abbreviation, _ in ranked[:limit]]
+
+
+def get_service_tagger(service_dict):
+    """
+    service_dict に対応するタガーを返す関数
+
+    Args:
+        service_dict (dict): サービス名とその略称の辞書
+
+    Returns:
+        ServiceTagger: タガー
+    """
+    global _tagger_cache
+    if _tagger_cache is None or _tagger_cache.service_dict is not service_dict:
+        _tagger_cache = ServiceTagger(service_dict)
+    return _tagger_cache
+
+
+def _service_patterns(service_name, abbreviation):
+    patterns = {service_name, abbreviation}
+    for name in (service_name, abbreviation):
+        for prefix in SERVICE_PREFIXES:
+            if name.startswith(prefix):
+                stripped = name[len(prefix):]
+                # "S3" や "DynamoDB" のような固有の表記だけを使い、"Support" のような一般的な単語は除く
+                if any(char.isupper() or char.isdigit() for char in stripped[1:]):
+                    patterns.add(stripped)
+    return patterns
+
+
+def _features(text):
+    features = set()
+    for token in re.findall(r'[a-z0-9]+', text.lower()):
+        if token in STOP_WORDS:
+            continue
+        features.add(('token', token))
+        padded = f' {token} '
+        features.update(('trigram', padded[i:i + 3]) for i in range(len(padded) - 2))
+    return features
+
+
+def _is_boundary(text, index):
+    return index < 0 or index >= len(text) or not text[index].isalnum()
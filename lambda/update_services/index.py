@@ -1,5 +1,6 @@
 import os
 import boto3
+import hashlib
 import json
 import time
 from botocore.exceptions import ClientError
@@ -8,6 +9,9 @@ from common import log_debug, log_info, log_error
 # 環境変数からDynamoDBテーブル名を取得
 SERVICES_TABLE_NAME = os.environ['SERVICES_TABLE_NAME']
 
+# サービス一覧のバージョン管理用アイテムのキー（process_article はこのアイテムでキャッシュを検証する）
+SERVICES_VERSION_KEY = "__version__"
+
 def get_all_aws_services():
     iam = boto3.client('iam')
     
@@ -154,6 +158,7 @@ def update_dynamodb_table(services):
     dynamodb = boto3.resource('dynamodb')
     table = dynamodb.Table(SERVICES_TABLE_NAME)
 
+    abbreviations = {}
     for service in services:
         if service in special_cases:
             abbreviated = special_cases[service]
@@ -167,9 +172,35 @@ def update_dynamodb_table(services):
                     'abbreviation': abbreviated
                 }
             )
+            abbreviations[service] = abbreviated
         except ClientError as e:
             log_error(f"Error updating DynamoDB for service {service}", error=str(e))
 
+    update_services_version(table, abbreviations)
+
+def update_services_version(table, abbreviations):
+    """
+    サービス一覧のチェックサムをバージョン管理用アイテムに書き込む関数
+
+    Args:
+        table: DynamoDBテーブル
+        abbreviations (dict): 書き込みに成功したサービス名とその略称の辞書
+    """
+    checksum = hashlib.sha256(
+        json.dumps(sorted(abbreviations.items()), ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+    try:
+        table.put_item(
+            Item={
+                'service_name': SERVICES_VERSION_KEY,
+                'checksum': checksum,
+                'service_count': len(abbreviations)
+            }
+        )
+        log_info("AWS service list version updated", checksum=checksum)
+    except ClientError as e:
+        log_error("Error updating AWS service list version", error=str(e))
+
 def handler(event, context):
     try:
         log_info("Starting AWS services update process")